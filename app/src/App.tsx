@@ -14,7 +14,11 @@ import {
 } from "./api";
 import type { CheckErrorOut } from "./api";
 import { appAlert } from "./utils";
-import type { PlaybackToggleDetail, PlaybackToggleResult } from "./lib/playback";
+import {
+  PLAYBACK_READY_EVENT,
+  type PlaybackToggleDetail,
+  type PlaybackToggleResult,
+} from "./lib/playback";
 
 import { Toolbar } from "./components/Toolbar";
 import { Explorer } from "./components/Explorer";
@@ -58,14 +62,22 @@ export default function App() {
   // agent.uiTools.togglePlayback → 转成 window CustomEvent,AudioViewer 自己监听。
   // AudioViewer 是临时组件:没开 wav / 刚 ui_open_file 还没挂载完时事件没人接。
   // 所以 (1) cancelable 事件,监听方 preventDefault + 往 detail.result 塞结果
-  // Promise 表示接住了;(2) 没接住每 200ms 重试,最多 5s(覆盖 open→toggle 同一批
-  // tool call 的挂载间隙);(3) 把结果回执给 main,agent 拿到真实成败而非假 ok。
+  // Promise 表示接住了;(2) 没接住就等 AudioViewer 挂载时广播的 PLAYBACK_READY_EVENT
+  // 再投一次(不轮询),最多等 5s(覆盖 open→toggle 同一批 tool call 的挂载间隙);
+  // (3) 把结果回执给 main,agent 拿到真实成败而非假 ok。
   useEffect(() => {
     const off = window.electronAPI.onPlaybackToggle((reqId, kind, on) => {
       const ack = (result: PlaybackToggleResult) =>
         window.electronAPI.playbackToggleResult(reqId, result);
-      const started = Date.now();
-      const attempt = () => {
+      let timer: number | null = null;
+      const stopWaiting = () => {
+        window.removeEventListener(PLAYBACK_READY_EVENT, attempt);
+        if (timer != null) {
+          window.clearTimeout(timer);
+          timer = null;
+        }
+      };
+      function attempt() {
         const detail: PlaybackToggleDetail = { on };
         const ev = new CustomEvent(`playback:toggle:${kind}`, {
           cancelable: true,
@@ -73,6 +85,7 @@ export default function App() {
         });
         const notHandled = window.dispatchEvent(ev); // preventDefault → false
         if (!notHandled) {
+          stopWaiting();
           if (detail.result) {
             detail.result.then(ack).catch((e) =>
               ack({
@@ -86,17 +99,18 @@ export default function App() {
           }
           return;
         }
-        if (Date.now() - started < 5000) {
-          setTimeout(attempt, 200);
-          return;
-        }
-        ack({
-          ok: false,
-          code: "NO_WAV_OPEN",
-          message:
-            "主窗口当前没有打开 wav(AudioViewer 未挂载);先 ui_open_file 打开总轨 wav 再开叠层",
-        });
-      };
+        if (timer != null) return; // 已在等 ready
+        window.addEventListener(PLAYBACK_READY_EVENT, attempt);
+        timer = window.setTimeout(() => {
+          stopWaiting();
+          ack({
+            ok: false,
+            code: "NO_WAV_OPEN",
+            message:
+              "主窗口当前没有打开 wav(AudioViewer 未挂载);先 ui_open_file 打开总轨 wav 再开叠层",
+          });
+        }, 5000);
+      }
       attempt();
     });
     return off;
@@ -279,11 +279,15 @@ async function sidecarUrl(): Promise<string> {
   return _sidecarUrl;
 }
 
-async function getJson<T>(p: string, params?: Record<string, string>): Promise<T> {
+async function getJson<T>(
+  p: string,
+  params?: Record<string, string>,
+  signal?: AbortSignal,
+): Promise<T> {
   const base = await sidecarUrl();
   const url = new URL(base + p);
   if (params) Object.entries(params).forEach(([k, v]) => url.searchParams.set(k, v));
-  const r = await fetch(url.toString());
+  const r = await fetch(url.toString(), { signal });
   if (!r.ok) throw new Error(`${p} ${r.status}: ${await r.text()}`);
   return (await r.json()) as T;
 }
@@ -301,10 +305,9 @@ async function postJson<T>(p: string, body: unknown): Promise<T> {
 
 export async function rawFileUrl(path: string): Promise<string> {
   const base = await sidecarUrl();
-  // 加时间戳 cache-bust:即使 sidecar Cache-Control 没生效(webview cache 行为有时
-  // 怪),不同的 URL 也强制重 fetch。代价仅是 query string 变化,sidecar 不解析 _t。
-  const t = Date.now();
-  return `${base}/files/raw?path=${encodeURIComponent(path)}&_t=${t}`;
+  // 不再加时间戳 cache-bust:sidecar 回 ETag + Cache-Control: no-cache,webview
+  // 每次带 If-None-Match 验证,文件没改走 304 复用缓存,保存后 ETag 变化自然拿新字节。
+  return `${base}/files/raw?path=${encodeURIComponent(path)}`;
 }
 
 export async function sendChat(messages: ChatMessage[]): Promise<ChatOut> {
@@ -414,8 +417,13 @@ export async function getAudioMetadata(path: string): Promise<AudioMetadataOut>
   return getJson("/tools/get_audio_metadata", { path });
 }
 
-export async function getAudioPeaks(path: string, columns = 4000): Promise<AudioPeaksOut> {
-  return getJson("/tools/get_audio_peaks", { path, columns: String(columns) });
+// signal:切文件时中止还没回来的请求,不再下载 / 解析已经没人要的 peaks JSON
+export async function getAudioPeaks(
+  path: string,
+  columns = 4000,
+  signal?: AbortSignal,
+): Promise<AudioPeaksOut> {
+  return getJson("/tools/get_audio_peaks", { path, columns: String(columns) }, signal);
 }
 
 // 写操作前广播 audio:release,通知 AudioViewer / MidiViewer 释放对应文件的播放句柄。
@@ -1,6 +1,5 @@
-import { FileQuestion, FolderOpen } from "lucide-react";
-import { CsvViewer } from "./editors/CsvViewer";
-import { MonacoTextViewer } from "./editors/MonacoTextViewer";
+import { lazy, Suspense } from "react";
+import { FileQuestion, FolderOpen, Loader2 } from "lucide-react";
 import { AudioViewer } from "./editors/AudioViewer";
 import { MidiViewer } from "./editors/MidiViewer";
 import { ErrorBoundary } from "./ErrorBoundary";
@@ -20,6 +19,20 @@ function extOf(p: string) {
   return m ? m[1].toLowerCase() : "";
 }
 
+// Monaco(连同 worker)体积大,只有 CSV / 文本查看器用得到:第一次打开这类文件时才加载,
+// 启动和混音台独立窗口都不再背它。monaco-setup 必须先于 Editor 挂载执行
+// (loader 指向本地打包的 monaco,否则会去 CDN 拉),所以串在查看器 chunk 前面。
+const CsvViewer = lazy(() =>
+  import("../monaco-setup")
+    .then(() => import("./editors/CsvViewer"))
+    .then((m) => ({ default: m.CsvViewer })),
+);
+const MonacoTextViewer = lazy(() =>
+  import("../monaco-setup")
+    .then(() => import("./editors/MonacoTextViewer"))
+    .then((m) => ({ default: m.MonacoTextViewer })),
+);
+
 const TEXT_EXTS = new Set(["txt", "md", "json", "log", "ini", "yml", "yaml"]);
 const AUDIO_EXTS = new Set(["wav", "mp3", "ogg", "flac", "m4a"]);
 const MIDI_EXTS = new Set(["mid", "midi"]);
@@ -81,7 +94,16 @@ export function Center({ selectedPath, selectedIsDir }: Props) {
     <div className="pane bg-bg">
       <div className="pane-header selectable">{basename(selectedPath)}</div>
       <ErrorBoundary label={`Center / ${ext || "无扩展"}`} key={selectedPath}>
-        {body}
+        <Suspense
+          fallback={
+            <div className="flex-1 flex items-center justify-center text-fg-muted gap-2">
+              <Loader2 size={16} className="animate-spin" />
+              <span>加载编辑器…</span>
+            </div>
+          }
+        >
+          {body}
+        </Suspense>
       </ErrorBoundary>
     </div>
   );
@@ -10,7 +10,13 @@ import {
   Volume2,
 } from "lucide-react";
 import { rawFileUrl } from "../api";
-import { useDarkTheme, setupWaveformCanvas } from "../lib/waveform";
+import {
+  useDarkTheme,
+  setupWaveformCanvas,
+  createWaveformLayers,
+  drawWaveformLayers,
+  type WaveformLayers,
+} from "../lib/waveform";
 import { MixEngine, type MixTrackData } from "../lib/mixEngine";
 import { clsx } from "../utils";
 
@@ -23,6 +29,29 @@ interface Props {
 
 const PEAKS_HEIGHT = 56;
 const TRACK_NAME_WIDTH = 160;
+// 同时在拉取 + 解码的轨道上限。整个分轨wav 文件夹一次拖进来可能十几条 96k/24bit,
+// 全部并发 fetch + decodeAudioData 时原始字节和解码后的 PCM 同时驻留,内存峰值很高。
+const MAX_CONCURRENT_LOADS = 3;
+
+// 固定 worker 数从共享队列取任务;结果按输入顺序返回。
+async function mapWithConcurrency<T, R>(
+  items: T[],
+  limit: number,
+  fn: (item: T) => Promise<R>,
+): Promise<R[]> {
+  const out = new Array<R>(items.length);
+  let next = 0;
+  const worker = async () => {
+    while (next < items.length) {
+      const i = next++;
+      out[i] = await fn(items[i]);
+    }
+  };
+  await Promise.all(
+    Array.from({ length: Math.min(limit, items.length) }, worker),
+  );
+  return out;
+}
 
 function fmtTime(sec: number): string {
   if (!Number.isFinite(sec) || sec < 0) sec = 0;
@@ -34,41 +63,28 @@ function fmtTime(sec: number): string {
 
 function drawTrackWaveform(
   canvas: HTMLCanvasElement,
+  layers: WaveformLayers,
   peaks: { mins: Float32Array; maxs: Float32Array },
   durationSec: number,
   posSec: number,
   dark: boolean,
 ) {
-  const w = setupWaveformCanvas(canvas, dark, 2);
-  if (!w) return;
-  const { ctx, width, height, dpr, centerY: cy, ampHalf } = w;
-
   const n = peaks.mins.length;
-  if (n === 0 || durationSec <= 0) return;
-
-  const playheadX =
-    posSec > 0 && posSec <= durationSec
-      ? Math.floor((posSec / durationSec) * width)
-      : -1;
-
-  const drawSegment = (xStart: number, xEnd: number, color: string) => {
-    if (xStart >= xEnd) return;
-    ctx.strokeStyle = color;
-    ctx.beginPath();
-    for (let x = xStart; x < xEnd; x++) {
-      const idx = Math.min(n - 1, Math.floor((x / width) * n));
-      const mn = peaks.mins[idx];
-      const mx = peaks.maxs[idx];
-      ctx.moveTo(x + 0.5, cy + mn * ampHalf);
-      ctx.lineTo(x + 0.5, cy + mx * ampHalf);
-    }
-    ctx.stroke();
-  };
-
-  const playedEnd = Math.max(0, Math.min(width, playheadX));
-  drawSegment(0, playedEnd, dark ? "#3794ff" : "#007acc");
-  drawSegment(playedEnd, width, dark ? "#6a6a6a" : "#9ca3af");
+  if (n === 0 || durationSec <= 0) {
+    setupWaveformCanvas(canvas, dark, 2);
+    return;
+  }
+  // 波形本体来自缓存的离屏层;行上除波形外只有播放头一条线,
+  // 所以每个 tick 只重拼新旧播放头之间那条竖带,再画新播放头
+  const inRange = posSec > 0 && posSec <= durationSec;
+  const w = drawWaveformLayers(
+    canvas, layers, peaks.mins, peaks.maxs, 0, n, dark, 2,
+    inRange ? posSec / durationSec : 0, true,
+  );
+  if (!w) return;
+  const { ctx, width, height, dpr } = w;
 
+  const playheadX = inRange ? Math.floor((posSec / durationSec) * width) : -1;
   if (playheadX >= 0 && playheadX <= width) {
     ctx.strokeStyle = "#ff3b30";
     ctx.lineWidth = 1 * dpr;
@@ -96,13 +112,16 @@ function TrackRow({
   onMute, onSolo, onRemove, onSeek, dark,
 }: TrackRowProps) {
   const canvasRef = useRef<HTMLCanvasElement | null>(null);
+  const layersRef = useRef<WaveformLayers | null>(null);
 
   useEffect(() => {
     const c = canvasRef.current;
     if (!c) return;
-    drawTrackWaveform(c, track.peaks, track.durationSec, posSec, dark);
+    if (!layersRef.current) layersRef.current = createWaveformLayers();
+    const layers = layersRef.current;
+    drawTrackWaveform(c, layers, track.peaks, track.durationSec, posSec, dark);
     const obs = new ResizeObserver(() => {
-      drawTrackWaveform(c, track.peaks, track.durationSec, posSec, dark);
+      drawTrackWaveform(c, layers, track.peaks, track.durationSec, posSec, dark);
     });
     obs.observe(c);
     return () => obs.disconnect();
@@ -299,18 +318,16 @@ export function MixConsole({ tracks, onRemove, onMinimize, onClose }: Props) {
       });
     }
     let cancelled = false;
-    void Promise.all(
-      toLoad.map(async (p) => {
-        try {
-          const url = await rawFileUrl(p);
-          await engine.loadTrack(p, url);
-          return { path: p, ok: true as const };
-        } catch (e) {
-          const msg = e instanceof Error ? e.message : String(e);
-          return { path: p, ok: false as const, error: msg };
-        }
-      }),
-    ).then((results) => {
+    void mapWithConcurrency(toLoad, MAX_CONCURRENT_LOADS, async (p) => {
+      try {
+        const url = await rawFileUrl(p);
+        await engine.loadTrack(p, url);
+        return { path: p, ok: true as const };
+      } catch (e) {
+        const msg = e instanceof Error ? e.message : String(e);
+        return { path: p, ok: false as const, error: msg };
+      }
+    }).then((results) => {
       if (cancelled) return;
       setLoadingPaths((prev) => {
         const n = new Set(prev);
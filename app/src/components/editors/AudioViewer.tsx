@@ -1,11 +1,21 @@
 import { useEffect, useMemo, useRef, useState } from "react";
 import { Loader2, AlertCircle, FileAudio, ZoomIn, ZoomOut, RotateCcw, Play, Pause, Volume2 } from "lucide-react";
 import { getAudioMetadata, getAudioPeaks, rawFileUrl, readCsv } from "../../api";
-import type { AudioMetadataOut, AudioPeaksOut } from "../../api";
-import { Metronome, type BeatMarker } from "../../lib/metronome";
-import { useDarkTheme, setupWaveformCanvas } from "../../lib/waveform";
+import type { AudioMetadataOut } from "../../api";
+import { sharedMetronome, type Metronome, type BeatMarker } from "../../lib/metronome";
+import {
+  useDarkTheme,
+  setupWaveformCanvas,
+  createWaveformLayers,
+  drawWaveformLayers,
+  type WaveformLayers,
+} from "../../lib/waveform";
 import { clsx, appAlert } from "../../utils";
-import type { PlaybackToggleDetail, PlaybackToggleResult } from "../../lib/playback";
+import {
+  PLAYBACK_READY_EVENT,
+  type PlaybackToggleDetail,
+  type PlaybackToggleResult,
+} from "../../lib/playback";
 
 interface Props {
   path: string;
@@ -74,11 +84,15 @@ function parseBeatRows(rows: string[][]): BeatMarker[] {
     const label = (r[lIdx] ?? "").trim();
     out.push({ t, isFirst: label.endsWith(".1") });
   }
+  // 叠层按时间二分取可见区间,这里保证有序
+  out.sort((a, b) => a.t - b.t);
   return out;
 }
 
 // Structure.csv:第 1 行 = 标签数组,第 2 行 = 时间戳数组(MM:SS 或 MM:SS.f)
 // 第 3 行起忽略(老版只读两行)。
+const STRUCTURE_TIME_RE = /^(\d+):(\d+(?:\.\d+)?)$/;
+
 function parseStructureRows(rows: string[][]): StructureMarker[] {
   if (rows.length < 2) return [];
   const labels = rows[0];
@@ -91,12 +105,9 @@ function parseStructureRows(rows: string[][]): StructureMarker[] {
     const ts = (times[i] ?? "").trim();
     const label = (labels[i] ?? "").trim();
     if (!ts || !label) continue;
-    const parts = ts.split(":");
-    if (parts.length !== 2) continue;
-    const mm = parseInt(parts[0], 10);
-    const ss = parseFloat(parts[1]);
-    if (!Number.isFinite(mm) || !Number.isFinite(ss)) continue;
-    out.push({ t: mm * 60 + ss, label });
+    const m = STRUCTURE_TIME_RE.exec(ts);
+    if (!m) continue;
+    out.push({ t: Number(m[1]) * 60 + Number(m[2]), label });
   }
   // 时间排序兜底
   out.sort((a, b) => a.t - b.t);
@@ -142,18 +153,28 @@ interface View {
   currentSec: number;
 }
 
+// 渲染端的波形包络:收到 JSON 后立刻转成 Float32Array(与混音台 MixTrackData.peaks 同形),
+// 之后的逐列映射都在连续的 32 位数组上走,JSON 解出来的 number[] 随即释放。
+interface WaveformPeaks {
+  columns: number;
+  mins: Float32Array;
+  maxs: Float32Array;
+}
+
+// 返回本次重画的列区间 [x0, x1),叠层只需在这条竖带里补画;null = 画布已整幅清空重画
 function drawWaveform(
   canvas: HTMLCanvasElement,
-  peaks: AudioPeaksOut,
+  peaks: WaveformPeaks,
   view: View,
   dark: boolean,
-) {
-  const w = setupWaveformCanvas(canvas, dark, 4);
-  if (!w) return;
-  const { ctx, width, height, dpr, centerY, ampHalf } = w;
-
+  layers: WaveformLayers,
+  incremental: boolean,
+): { x0: number; x1: number } | null {
   const n = peaks.columns;
-  if (n === 0 || view.duration <= 0 || view.visibleSec <= 0) return;
+  if (n === 0 || view.duration <= 0 || view.visibleSec <= 0) {
+    setupWaveformCanvas(canvas, dark, 4);
+    return null;
+  }
 
   // 可见时间范围 → peaks 索引切片
   const t0 = view.offsetSec;
@@ -162,37 +183,18 @@ function drawWaveform(
   const i1 = Math.min(n - 1, Math.ceil((t1 / view.duration) * n));
   const slice = Math.max(1, i1 - i0);
 
-  // 播放头 X(限定在 [-1, width+1])
-  let playheadX = -1;
-  if (view.currentSec >= t0 && view.currentSec <= t1) {
-    playheadX = Math.floor(((view.currentSec - t0) / view.visibleSec) * width);
-  } else if (view.currentSec > t1) {
-    playheadX = width + 1;
-  }
-
-  const drawSegment = (xStart: number, xEnd: number, color: string) => {
-    if (xStart >= xEnd) return;
-    ctx.strokeStyle = color;
-    ctx.beginPath();
-    for (let x = xStart; x < xEnd; x++) {
-      const idx = Math.min(n - 1, i0 + Math.floor((x / width) * slice));
-      const mn = peaks.mins[idx];
-      const mx = peaks.maxs[idx];
-      const y1 = centerY + mn * ampHalf;
-      const y2 = centerY + mx * ampHalf;
-      ctx.moveTo(x + 0.5, y1);
-      ctx.lineTo(x + 0.5, y2);
-    }
-    ctx.stroke();
-  };
-
-  // 已播 / 未播 分段
-  const playedEnd = Math.max(0, Math.min(width, playheadX));
-  drawSegment(0, playedEnd, dark ? "#3794ff" : "#007acc");
-  drawSegment(playedEnd, width, dark ? "#6a6a6a" : "#9ca3af");
+  // 波形本体(已播 / 未播两套配色)缓存在离屏层里,只在切片 / 尺寸 / 主题变化时重画;
+  // 播放头前进只是按新分界重拼两层(incremental 时只重拼新旧播放头之间的竖带),再画播放头线
+  const w = drawWaveformLayers(
+    canvas, layers, peaks.mins, peaks.maxs, i0, slice, dark, 4,
+    (view.currentSec - t0) / view.visibleSec, incremental,
+  );
+  if (!w) return null;
+  const { ctx, width, height, dpr, x0, x1 } = w;
 
-  // 播放头线
-  if (playheadX >= 0 && playheadX <= width) {
+  // 播放头 X(可见窗口外不画)
+  if (view.currentSec >= t0 && view.currentSec <= t1) {
+    const playheadX = Math.floor(((view.currentSec - t0) / view.visibleSec) * width);
     ctx.strokeStyle = "#ff3b30";
     ctx.lineWidth = 1 * dpr;
     ctx.beginPath();
@@ -200,6 +202,19 @@ function drawWaveform(
     ctx.lineTo(playheadX + 0.5, height);
     ctx.stroke();
   }
+  return x0 === 0 && x1 === width ? null : { x0, x1 };
+}
+
+// 按 t 升序的 marker 里第一个 t >= t0 的下标;叠层只从这里扫到 t1,不必每帧走完整首歌
+function firstAtOrAfter(items: { t: number }[], t0: number): number {
+  let lo = 0;
+  let hi = items.length;
+  while (lo < hi) {
+    const mid = (lo + hi) >>> 1;
+    if (items[mid].t < t0) lo = mid + 1;
+    else hi = mid;
+  }
+  return lo;
 }
 
 // 节拍线叠层:主拍粗实线、副拍细半透明线。
@@ -218,14 +233,18 @@ function drawBeatOverlay(
   const t0 = view.offsetSec;
   const t1 = view.offsetSec + view.visibleSec;
 
+  const i0 = firstAtOrAfter(beats, t0);
+  let i1 = i0;
+  while (i1 < beats.length && beats[i1].t <= t1) i1++;
+
   // 副拍先画(底),主拍后画(顶)
   ctx.save();
   ctx.strokeStyle = dark ? "rgba(148,163,184,0.45)" : "rgba(100,116,139,0.55)";
   ctx.lineWidth = 1 * dpr;
   ctx.beginPath();
-  for (const b of beats) {
+  for (let i = i0; i < i1; i++) {
+    const b = beats[i];
     if (b.isFirst) continue;
-    if (b.t < t0 || b.t > t1) continue;
     const x = Math.floor(((b.t - t0) / view.visibleSec) * width);
     ctx.moveTo(x + 0.5, 0);
     ctx.lineTo(x + 0.5, height);
@@ -235,9 +254,9 @@ function drawBeatOverlay(
   ctx.strokeStyle = dark ? "#a78bfa" : "#7c3aed";
   ctx.lineWidth = 2 * dpr;
   ctx.beginPath();
-  for (const b of beats) {
+  for (let i = i0; i < i1; i++) {
+    const b = beats[i];
     if (!b.isFirst) continue;
-    if (b.t < t0 || b.t > t1) continue;
     const x = Math.floor(((b.t - t0) / view.visibleSec) * width);
     ctx.moveTo(x + 0.5, 0);
     ctx.lineTo(x + 0.5, height);
@@ -266,48 +285,59 @@ function drawStructureOverlay(
   ctx.font = `${11 * dpr}px ui-sans-serif, system-ui, sans-serif`;
   ctx.textBaseline = "top";
 
-  for (const m of markers) {
-    if (m.t < t0 || m.t > t1) continue;
-    const x = Math.floor(((m.t - t0) / view.visibleSec) * width);
+  const visible: { x: number; label: string }[] = [];
+  for (let i = firstAtOrAfter(markers, t0); i < markers.length && markers[i].t <= t1; i++) {
+    const m = markers[i];
+    visible.push({ x: Math.floor(((m.t - t0) / view.visibleSec) * width), label: m.label });
+  }
+  if (visible.length === 0) {
+    ctx.restore();
+    return;
+  }
 
-    // 竖虚线
-    ctx.strokeStyle = dark ? "rgba(52,211,153,0.95)" : "rgba(5,150,105,0.95)";
-    ctx.lineWidth = 1.5 * dpr;
-    ctx.setLineDash([5 * dpr, 4 * dpr]);
-    ctx.beginPath();
+  // 竖虚线:所有 marker 拼成一条 path,一次 stroke
+  ctx.strokeStyle = dark ? "rgba(52,211,153,0.95)" : "rgba(5,150,105,0.95)";
+  ctx.lineWidth = 1.5 * dpr;
+  ctx.setLineDash([5 * dpr, 4 * dpr]);
+  ctx.beginPath();
+  for (const { x } of visible) {
     ctx.moveTo(x + 0.5, 0);
     ctx.lineTo(x + 0.5, height);
-    ctx.stroke();
-    ctx.setLineDash([]);
-
-    // 顶部标签胶囊
-    if (m.label) {
-      const padX = 5 * dpr;
-      const padY = 3 * dpr;
-      const txtY = 4 * dpr;
-      const measure = ctx.measureText(m.label);
-      const txtW = measure.width;
-      const txtH = 11 * dpr;
-      const boxX = x + 2 * dpr;
-      const boxW = txtW + padX * 2;
-      const boxH = txtH + padY * 2;
-      ctx.fillStyle = dark ? "rgba(52,211,153,0.92)" : "rgba(5,150,105,0.92)";
-      ctx.beginPath();
-      const r = 3 * dpr;
-      // 圆角矩形(兼容老 Canvas API,用 path 拼)
-      ctx.moveTo(boxX + r, txtY);
-      ctx.lineTo(boxX + boxW - r, txtY);
-      ctx.quadraticCurveTo(boxX + boxW, txtY, boxX + boxW, txtY + r);
-      ctx.lineTo(boxX + boxW, txtY + boxH - r);
-      ctx.quadraticCurveTo(boxX + boxW, txtY + boxH, boxX + boxW - r, txtY + boxH);
-      ctx.lineTo(boxX + r, txtY + boxH);
-      ctx.quadraticCurveTo(boxX, txtY + boxH, boxX, txtY + boxH - r);
-      ctx.lineTo(boxX, txtY + r);
-      ctx.quadraticCurveTo(boxX, txtY, boxX + r, txtY);
-      ctx.fill();
-      ctx.fillStyle = "#ffffff";
-      ctx.fillText(m.label, boxX + padX, txtY + padY);
-    }
+  }
+  ctx.stroke();
+  ctx.setLineDash([]);
+
+  // 顶部标签胶囊:底色同样一条 path 一次 fill,文字随后逐个画
+  const padX = 5 * dpr;
+  const padY = 3 * dpr;
+  const txtY = 4 * dpr;
+  const txtH = 11 * dpr;
+  const boxH = txtH + padY * 2;
+  const r = 3 * dpr;
+  const labels: { label: string; boxX: number }[] = [];
+  ctx.fillStyle = dark ? "rgba(52,211,153,0.92)" : "rgba(5,150,105,0.92)";
+  ctx.beginPath();
+  for (const { x, label } of visible) {
+    if (!label) continue;
+    const boxX = x + 2 * dpr;
+    const boxW = ctx.measureText(label).width + padX * 2;
+    // 圆角矩形(兼容老 Canvas API,用 path 拼)
+    ctx.moveTo(boxX + r, txtY);
+    ctx.lineTo(boxX + boxW - r, txtY);
+    ctx.quadraticCurveTo(boxX + boxW, txtY, boxX + boxW, txtY + r);
+    ctx.lineTo(boxX + boxW, txtY + boxH - r);
+    ctx.quadraticCurveTo(boxX + boxW, txtY + boxH, boxX + boxW - r, txtY + boxH);
+    ctx.lineTo(boxX + r, txtY + boxH);
+    ctx.quadraticCurveTo(boxX, txtY + boxH, boxX, txtY + boxH - r);
+    ctx.lineTo(boxX, txtY + r);
+    ctx.quadraticCurveTo(boxX, txtY, boxX + r, txtY);
+    ctx.closePath();
+    labels.push({ label, boxX });
+  }
+  ctx.fill();
+  ctx.fillStyle = "#ffffff";
+  for (const { label, boxX } of labels) {
+    ctx.fillText(label, boxX + padX, txtY + padY);
   }
   ctx.restore();
 }
@@ -316,7 +346,7 @@ export function AudioViewer({ path }: Props) {
   const [meta, setMeta] = useState<AudioMetadataOut | null>(null);
   const [error, setError] = useState<string | null>(null);
   const [audioUrl, setAudioUrl] = useState<string | null>(null);
-  const [peaks, setPeaks] = useState<AudioPeaksOut | null>(null);
+  const [peaks, setPeaks] = useState<WaveformPeaks | null>(null);
   const [peaksLoading, setPeaksLoading] = useState(false);
   const [peaksError, setPeaksError] = useState<string | null>(null);
   const [currentSec, setCurrentSec] = useState(0);
@@ -343,8 +373,14 @@ export function AudioViewer({ path }: Props) {
     startX: number;
     startOffset: number;
     moved: boolean;
+    // mousedown 时量一次画布位置/宽度,拖动/松开期间复用,不在每次 mousemove 里读布局
+    left: number;
+    width: number;
   } | null>(null);
   const metronomeRef = useRef<Metronome | null>(null);
+  const waveformLayersRef = useRef<WaveformLayers | null>(null);
+  // 上一次画到画布上的视图 / 叠层输入,用来判断这一帧是不是只有播放头动了
+  const drawnSceneRef = useRef<unknown[] | null>(null);
   const dark = useDarkTheme();
 
   const songPaths = useMemo(() => inferSongPaths(path), [path]);
@@ -371,10 +407,6 @@ export function AudioViewer({ path }: Props) {
     setBeats([]);
     setStructureRender(false);
     setStructure([]);
-    if (metronomeRef.current) {
-      metronomeRef.current.dispose();
-      metronomeRef.current = null;
-    }
     Promise.all([getAudioMetadata(path), rawFileUrl(path)])
       .then(([m, url]) => {
         if (cancelled) return;
@@ -421,12 +453,17 @@ export function AudioViewer({ path }: Props) {
   // 服务端算 peaks
   useEffect(() => {
     let cancelled = false;
+    const abort = new AbortController();
     setPeaksLoading(true);
     setPeaksError(null);
-    getAudioPeaks(path, 4000)
+    getAudioPeaks(path, 4000, abort.signal)
       .then((p) => {
         if (cancelled) return;
-        setPeaks(p);
+        setPeaks({
+          columns: p.columns,
+          mins: Float32Array.from(p.mins),
+          maxs: Float32Array.from(p.maxs),
+        });
       })
       .catch((e: Error) => {
         if (cancelled) return;
@@ -437,6 +474,7 @@ export function AudioViewer({ path }: Props) {
       });
     return () => {
       cancelled = true;
+      abort.abort();
     };
   }, [path]);
 
@@ -445,12 +483,30 @@ export function AudioViewer({ path }: Props) {
     const canvas = canvasRef.current;
     if (!canvas || !peaks) return;
     const view: View = { duration, offsetSec, visibleSec, currentSec };
+    // 除播放头外画面上的东西(视图窗口 / 叠层数据 / 主题)都没变 → 只需重画播放头附近的竖带
+    const scene: unknown[] = [
+      peaks, duration, offsetSec, visibleSec, dark,
+      beatRender, beats, structureRender, structure,
+    ];
+    const prevScene = drawnSceneRef.current;
+    const sameScene = prevScene !== null && scene.every((v, i) => v === prevScene[i]);
+    drawnSceneRef.current = scene;
     const draw = () => {
-      drawWaveform(canvas, peaks, view, dark);
+      if (!waveformLayersRef.current) waveformLayersRef.current = createWaveformLayers();
+      const strip = drawWaveform(canvas, peaks, view, dark, waveformLayersRef.current, sameScene);
+      const ctx = strip ? canvas.getContext("2d") : null;
+      if (ctx && strip) {
+        // 叠层只补画在刚重拼的竖带里,竖带外上一帧画的叠层原样保留
+        ctx.save();
+        ctx.beginPath();
+        ctx.rect(strip.x0, 0, strip.x1 - strip.x0, canvas.height);
+        ctx.clip();
+      }
       if (beatRender && beats.length > 0) drawBeatOverlay(canvas, beats, view, dark);
       if (structureRender && structure.length > 0) {
         drawStructureOverlay(canvas, structure, view, dark);
       }
+      if (ctx && strip) ctx.restore();
     };
     draw();
     const obs = new ResizeObserver(draw);
@@ -462,10 +518,16 @@ export function AudioViewer({ path }: Props) {
   ]);
 
   // 监听 audio 播放进度 + 自动跟随
+  // timeupdate / seeked 可能一帧内连发,合并到下一帧只读一次 currentTime、只重绘一次
   useEffect(() => {
     const a = audioRef.current;
     if (!a) return;
+    let raf = 0;
     const onTime = () => {
+      if (!raf) raf = requestAnimationFrame(applyTime);
+    };
+    const applyTime = () => {
+      raf = 0;
       const t = a.currentTime;
       setCurrentSec(t);
       // 播放头超出可见窗口右侧 → 滚动跟随
@@ -485,6 +547,7 @@ export function AudioViewer({ path }: Props) {
     a.addEventListener("timeupdate", onTime);
     a.addEventListener("seeked", onTime);
     return () => {
+      cancelAnimationFrame(raf);
       a.removeEventListener("timeupdate", onTime);
       a.removeEventListener("seeked", onTime);
     };
@@ -559,10 +622,10 @@ export function AudioViewer({ path }: Props) {
     metronomeRef.current?.setVolume(metronomeVolPct / 100);
   }, [metronomeVolPct]);
 
-  // 卸载时释放 metronome
+  // 卸载时把共用的 metronome 解绑(不关 AudioContext,下一个查看器接着用)
   useEffect(() => {
     return () => {
-      metronomeRef.current?.dispose();
+      metronomeRef.current?.detach();
       metronomeRef.current = null;
     };
   }, []);
@@ -597,22 +660,23 @@ export function AudioViewer({ path }: Props) {
 
   const onMouseDown = (e: React.MouseEvent<HTMLCanvasElement>) => {
     if (e.button !== 0) return;
+    const rect = e.currentTarget.getBoundingClientRect();
     dragStateRef.current = {
       startX: e.clientX,
       startOffset: offsetSec,
       moved: false,
+      left: rect.left,
+      width: rect.width,
     };
   };
 
   const onMouseMove = (e: React.MouseEvent<HTMLCanvasElement>) => {
     const state = dragStateRef.current;
-    if (!state) return;
-    const canvas = canvasRef.current;
-    if (!canvas) return;
+    if (!state || state.width <= 0) return;
     const dx = e.clientX - state.startX;
     if (Math.abs(dx) > DRAG_PIXEL_THRESHOLD) state.moved = true;
     if (!state.moved) return;
-    const dt = -(dx / canvas.clientWidth) * visibleSec;
+    const dt = -(dx / state.width) * visibleSec;
     setOffsetSec(
       clamp(state.startOffset + dt, 0, Math.max(0, duration - visibleSec)),
     );
@@ -624,10 +688,8 @@ export function AudioViewer({ path }: Props) {
     if (!state || state.moved) return;
     // 视为单击 → seek
     const a = audioRef.current;
-    const canvas = canvasRef.current;
-    if (!a || !canvas) return;
-    const rect = canvas.getBoundingClientRect();
-    const u = clamp((e.clientX - rect.left) / rect.width, 0, 1);
+    if (!a || state.width <= 0) return;
+    const u = clamp((e.clientX - state.left) / state.width, 0, 1);
     const t = offsetSec + u * visibleSec;
     a.currentTime = clamp(t, 0, duration);
   };
@@ -682,7 +744,7 @@ export function AudioViewer({ path }: Props) {
       setBeats(parsed);
       setBeatRender(true);
       // 准备 metronome
-      if (!metronomeRef.current) metronomeRef.current = new Metronome();
+      if (!metronomeRef.current) metronomeRef.current = sharedMetronome();
       metronomeRef.current.setBeats(parsed);
       metronomeRef.current.setVolume(metronomeVolPct / 100);
       const a = audioRef.current;
@@ -776,6 +838,8 @@ export function AudioViewer({ path }: Props) {
     const onStruct = (e: Event) => handle(e, "structure");
     window.addEventListener("playback:toggle:beat", onBeat);
     window.addEventListener("playback:toggle:structure", onStruct);
+    // 通知 App:监听已就位,之前没人接的 toggle 可以重投了
+    window.dispatchEvent(new Event(PLAYBACK_READY_EVENT));
     return () => {
       window.removeEventListener("playback:toggle:beat", onBeat);
       window.removeEventListener("playback:toggle:structure", onStruct);
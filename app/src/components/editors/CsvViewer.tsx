@@ -1,4 +1,4 @@
-import { useEffect, useMemo, useRef, useState } from "react";
+import { memo, useCallback, useEffect, useMemo, useRef, useState } from "react";
 import Editor from "@monaco-editor/react";
 import Papa from "papaparse";
 import {
@@ -23,6 +23,17 @@ interface Props {
 
 type Mode = "table" | "text";
 
+// 表格模式只挂载视口内(上下各多留 OVERSCAN_ROWS)的行,其余用上下两个占位行撑出滚动高度。
+// 几万行的 Beat.csv 每行十几个 <input>,全量挂载时打开 / 每次编辑都要 diff 整张表。
+const ROW_HEIGHT_FALLBACK = 22;
+const OVERSCAN_ROWS = 20;
+// 分块加载:首块拿到就先显示,后面的块在后台按倍增的窗口继续拉,拉完之前只读
+// (每次请求 sidecar 都从文件头扫到窗口,窗口倍增让请求数只随行数对数增长)
+const FIRST_CHUNK_ROWS = 2000;
+// 固定列宽 + table-layout: fixed:浏览器按 <colgroup> 直接排版,不必每次滚动 / 编辑
+// 都拿挂载的每个格子量一遍内容宽度;数据列宽约等于 <input> 默认 20 字符宽
+const DATA_COL_WIDTH_REM = 10;
+
 type Cmd =
   | { type: "cell"; ri: number; ci: number; oldVal: string; newVal: string }
   | { type: "insertRow"; ri: number }
@@ -30,8 +41,22 @@ type Cmd =
   | { type: "insertCol"; ci: number }
   | { type: "removeCol"; ci: number; data: string[] };
 
+// 行数组从不原地修改,按行缓存序列化结果:改了几格再切文本模式 / 比对原文时,
+// 只有被复制过的那几行重新 unparse,其余行直接拼缓存
+const rowTextCache = new WeakMap<string[], string>();
+
 function rowsToText(rows: string[][]): string {
-  return Papa.unparse(rows, { newline: "\n" });
+  const lines = new Array<string>(rows.length);
+  for (let i = 0; i < rows.length; i++) {
+    const r = rows[i];
+    let line = rowTextCache.get(r);
+    if (line === undefined) {
+      line = Papa.unparse([r], { newline: "\n" });
+      rowTextCache.set(r, line);
+    }
+    lines[i] = line;
+  }
+  return lines.join("\n");
 }
 
 function textToRows(text: string): string[][] {
@@ -48,11 +73,14 @@ function colCountOf(rows: string[][]): number {
 function applyCmd(rows: string[][], cmd: Cmd, reverse: boolean): string[][] {
   switch (cmd.type) {
     case "cell": {
+      // 只复制被改的那一行,其余行数组原样共享(行组件据此跳过重渲染)
       const value = reverse ? cmd.oldVal : cmd.newVal;
-      const next = rows.map((r) => [...r]);
-      if (cmd.ri >= next.length) return next;
-      while (next[cmd.ri].length <= cmd.ci) next[cmd.ri].push("");
-      next[cmd.ri][cmd.ci] = value;
+      if (cmd.ri >= rows.length) return rows.slice();
+      const next = rows.slice();
+      const row = [...next[cmd.ri]];
+      while (row.length <= cmd.ci) row.push("");
+      row[cmd.ci] = value;
+      next[cmd.ri] = row;
       return next;
     }
     case "insertRow": {
@@ -62,7 +90,8 @@ function applyCmd(rows: string[][], cmd: Cmd, reverse: boolean): string[][] {
       return [...rows.slice(0, cmd.ri), blank, ...rows.slice(cmd.ri)];
     }
     case "removeRow": {
-      if (reverse) return [...rows.slice(0, cmd.ri), [...cmd.data], ...rows.slice(cmd.ri)];
+      // 行数组从不原地修改(改格子也是复制那一行),undo 记录直接持有被删的那一行,还原时原样插回
+      if (reverse) return [...rows.slice(0, cmd.ri), cmd.data, ...rows.slice(cmd.ri)];
       return rows.filter((_, i) => i !== cmd.ri);
     }
     case "insertCol": {
@@ -105,11 +134,91 @@ function useDarkTheme() {
   return dark;
 }
 
+interface RowActions {
+  insertRow: (ri: number) => void;
+  removeRow: (ri: number) => void;
+  updateCell: (ri: number, ci: number, value: string) => void;
+  focusCell: (ri: number, ci: number) => void;
+}
+
+interface CsvRowProps {
+  ri: number;
+  row: string[];
+  colCount: number;
+  rowFocused: boolean;
+  focusedCol: number;
+  actions: RowActions;
+  measureRef?: (el: HTMLTableRowElement | null) => void;
+}
+
+// 单行按 props 浅比较跳过重渲染:改一个格子只有那一行的数组是新的,其余行原样复用,
+// 不必每次按键把视口里所有行、所有 <input> 都重新 diff 一遍。
+const CsvRow = memo(function CsvRow({
+  ri, row, colCount, rowFocused, focusedCol, actions, measureRef,
+}: CsvRowProps) {
+  return (
+    <tr ref={measureRef} className="group hover:bg-bg-hover">
+      <td
+        className={clsx(
+          "text-fg-subtle text-right px-1 py-0 border-r border-b border-border-subtle whitespace-nowrap overflow-hidden select-none",
+          rowFocused && "bg-bg-selected text-fg",
+        )}
+      >
+        <div className="flex items-center justify-end gap-1">
+          <button
+            onClick={() => actions.insertRow(ri)}
+            className="opacity-0 group-hover:opacity-100 hover:text-fg transition"
+            title="在该行上方插入"
+          >
+            <ChevronUp size={10} />
+          </button>
+          <button
+            onClick={() => actions.insertRow(ri + 1)}
+            className="opacity-0 group-hover:opacity-100 hover:text-fg transition"
+            title="在该行下方插入"
+          >
+            <ChevronDown size={10} />
+          </button>
+          <button
+            onClick={() => actions.removeRow(ri)}
+            className="opacity-0 group-hover:opacity-100 hover:text-danger transition"
+            title="删除该行"
+          >
+            <Trash2 size={10} />
+          </button>
+          <span>{ri === 0 ? "H" : ri}</span>
+        </div>
+      </td>
+      {Array.from({ length: Math.max(colCount, 1) }).map((_, ci) => (
+        <td
+          key={ci}
+          className={clsx(
+            "border-r border-b border-border-subtle p-0 align-top",
+            ri === 0 && "bg-bg-sidebar",
+            focusedCol === ci && ri !== 0 && "bg-bg-hover",
+          )}
+        >
+          <input
+            value={row[ci] ?? ""}
+            onChange={(e) => actions.updateCell(ri, ci, e.target.value)}
+            onFocus={() => actions.focusCell(ri, ci)}
+            className={clsx(
+              "w-full px-2 py-0.5 bg-transparent border-0 outline-none",
+              "focus:bg-bg-selected font-mono text-xs",
+              ri === 0 ? "text-fg font-semibold" : "text-fg",
+            )}
+          />
+        </td>
+      ))}
+    </tr>
+  );
+});
+
 export function CsvViewer({ path }: Props) {
   const [rows, setRows] = useState<string[][] | null>(null);
-  const [originalText, setOriginalText] = useState<string>("");
   const [error, setError] = useState<string | null>(null);
   const [loading, setLoading] = useState(false);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [dirty, setDirty] = useState(false);
   const [saving, setSaving] = useState(false);
   const [mode, setMode] = useState<Mode>("table");
@@ -117,6 +226,11 @@ export function CsvViewer({ path }: Props) {
   const [undoStack, setUndoStack] = useState<Cmd[]>([]);
   const [redoStack, setRedoStack] = useState<Cmd[]>([]);
   const [focused, setFocused] = useState<{ ri: number; ci: number } | null>(null);
+  // 虚拟滚动窗口:视口首行 + 视口可容纳行数(只在跨行时更新,滚动不逐像素重渲染)
+  const [rowHeight, setRowHeight] = useState(ROW_HEIGHT_FALLBACK);
+  const [firstVisibleRow, setFirstVisibleRow] = useState(0);
+  const [visibleRowCount, setVisibleRowCount] = useState(50);
+  const scrollRef = useRef<HTMLDivElement | null>(null);
   const dark = useDarkTheme();
 
   // 引用最新的 state 给键盘 handler 用，避免重新绑定
@@ -125,13 +239,22 @@ export function CsvViewer({ path }: Props) {
   const redoStackRef = useRef(redoStack);
   const dirtyRef = useRef(dirty);
   const savingRef = useRef(saving);
+  const loadingMoreRef = useRef(loadingMore);
   const modeRef = useRef(mode);
   const textValueRef = useRef(textValue);
+  // 磁盘上的原始内容。文本形态(Papa.unparse 全表)只在文本模式判 dirty 时才用得到,
+  // 按需算一次缓存,加载 / 表格模式保存时不在主线程上白做一遍整表序列化。
+  const originalRowsRef = useRef<string[][]>([]);
+  const originalTextRef = useRef<string | null>(null);
+  // 最近一次模式切换时互相转换出的 rows / 文本对。切回去时两边都没改过就直接复用,
+  // 来回切换不再每次整表 Papa.unparse / Papa.parse。
+  const modeSyncRef = useRef<{ rows: string[][]; text: string } | null>(null);
   rowsRef.current = rows;
   undoStackRef.current = undoStack;
   redoStackRef.current = redoStack;
   dirtyRef.current = dirty;
   savingRef.current = saving;
+  loadingMoreRef.current = loadingMore;
   modeRef.current = mode;
   textValueRef.current = textValue;
 
@@ -142,45 +265,99 @@ export function CsvViewer({ path }: Props) {
     setError(null);
     setDirty(false);
     setLoading(true);
+    setLoadingMore(false);
     setMode("table");
     setUndoStack([]);
     setRedoStack([]);
     setFocused(null);
-    readCsv(path)
-      .then((out) => {
+    setFirstVisibleRow(0);
+    const load = async () => {
+      let out = await readCsv(path, 0, FIRST_CHUNK_ROWS);
+      if (cancelled) return;
+      let all = out.rows;
+      setRows(all);
+      originalRowsRef.current = all;
+      originalTextRef.current = null;
+      modeSyncRef.current = null;
+      setTextValue("");
+      setLoading(false);
+      let chunk = FIRST_CHUNK_ROWS;
+      if (out.truncated) setLoadingMore(true);
+      while (out.truncated) {
+        chunk *= 2;
+        out = await readCsv(path, all.length, all.length + chunk);
         if (cancelled) return;
-        setRows(out.rows);
-        const text = rowsToText(out.rows);
-        setOriginalText(text);
-        setTextValue(text);
-      })
-      .catch((e: Error) => {
-        if (cancelled) return;
-        setError(e.message);
-      })
-      .finally(() => {
-        if (!cancelled) setLoading(false);
-      });
+        all = all.concat(out.rows);
+        setRows(all);
+        originalRowsRef.current = all;
+        if (out.rows.length === 0) break;
+      }
+      setLoadingMore(false);
+    };
+    load().catch((e: Error) => {
+      if (cancelled) return;
+      setError(e.message);
+      setLoading(false);
+      setLoadingMore(false);
+    });
     return () => {
       cancelled = true;
     };
   }, [path]);
 
   const switchTo = (next: Mode) => {
-    if (next === mode) return;
+    if (next === mode || loadingMore) return;
+    const sync = modeSyncRef.current;
     if (next === "table") {
-      setRows(textToRows(textValue));
+      if (sync && sync.text === textValue) {
+        setRows(sync.rows);
+      } else {
+        const parsed = textToRows(textValue);
+        modeSyncRef.current = { rows: parsed, text: textValue };
+        setRows(parsed);
+      }
     } else {
-      setTextValue(rowsToText(rows ?? []));
+      const current = rows ?? [];
+      if (sync && sync.rows === current) {
+        setTextValue(sync.text);
+      } else {
+        const text = rowsToText(current);
+        modeSyncRef.current = { rows: current, text };
+        setTextValue(text);
+      }
     }
     setMode(next);
   };
 
   const colCount = useMemo(() => colCountOf(rows ?? []), [rows]);
 
+  const syncViewport = () => {
+    const el = scrollRef.current;
+    if (!el) return;
+    setFirstVisibleRow(Math.floor(el.scrollTop / rowHeight));
+    setVisibleRowCount(Math.ceil(el.clientHeight / rowHeight) + 1);
+  };
+
+  // 视口高度变化(拖分栏 / 窗口缩放)重算可容纳行数;切回表格模式时容器重新挂载
+  useEffect(() => {
+    const el = scrollRef.current;
+    if (!el) return;
+    syncViewport();
+    const obs = new ResizeObserver(syncViewport);
+    obs.observe(el);
+    return () => obs.disconnect();
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [mode, rowHeight, loading, rows === null]);
+
+  // 量一次真实行高(字体 / 缩放不同时和估计值有出入),之后窗口计算都按它
+  const measureRow = useCallback((el: HTMLTableRowElement | null) => {
+    const h = el?.offsetHeight ?? 0;
+    if (h > 0) setRowHeight((prev) => (prev === h ? prev : h));
+  }, []);
+
   // 派发命令：应用到 rows，压入 undo 栈，清空 redo 栈
   const dispatch = (cmd: Cmd) => {
-    if (!rows) return;
+    if (!rows || loadingMoreRef.current) return;
     setRows(applyCmd(rows, cmd, false));
     setUndoStack([...undoStack, cmd]);
     setRedoStack([]);
@@ -223,8 +400,7 @@ export function CsvViewer({ path }: Props) {
 
   const removeRow = (ri: number) => {
     if (!rows) return;
-    const data = rows[ri] ? [...rows[ri]] : [];
-    dispatch({ type: "removeRow", ri, data });
+    dispatch({ type: "removeRow", ri, data: rows[ri] ?? [] });
   };
 
   const insertCol = (ci: number) => {
@@ -238,13 +414,30 @@ export function CsvViewer({ path }: Props) {
     dispatch({ type: "removeCol", ci, data });
   };
 
+  const originalText = (): string => {
+    if (originalTextRef.current === null) {
+      originalTextRef.current = rowsToText(originalRowsRef.current);
+    }
+    return originalTextRef.current;
+  };
+
+  // 给行组件的稳定回调:引用不变,行组件的 memo 才能生效;实际处理走 ref 里最新的闭包
+  const rowHandlersRef = useRef({ insertRow, removeRow, updateCell });
+  rowHandlersRef.current = { insertRow, removeRow, updateCell };
+  const rowActions = useMemo<RowActions>(() => ({
+    insertRow: (ri) => rowHandlersRef.current.insertRow(ri),
+    removeRow: (ri) => rowHandlersRef.current.removeRow(ri),
+    updateCell: (ri, ci, value) => rowHandlersRef.current.updateCell(ri, ci, value),
+    focusCell: (ri, ci) => setFocused({ ri, ci }),
+  }), []);
+
   const handleTextChange = (v: string | undefined) => {
     setTextValue(v ?? "");
-    setDirty((v ?? "") !== originalText);
+    setDirty((v ?? "") !== originalText());
   };
 
   const save = async () => {
-    if (!dirtyRef.current || savingRef.current) return;
+    if (!dirtyRef.current || savingRef.current || loadingMoreRef.current) return;
     setSaving(true);
     try {
       const finalRows = modeRef.current === "table"
@@ -252,9 +445,14 @@ export function CsvViewer({ path }: Props) {
         : textToRows(textValueRef.current);
       await writeCsv(path, finalRows);
       setRows(finalRows);
-      const text = rowsToText(finalRows);
-      setOriginalText(text);
-      setTextValue(text);
+      originalRowsRef.current = finalRows;
+      originalTextRef.current = null;
+      if (modeRef.current === "text") {
+        const text = rowsToText(finalRows);
+        originalTextRef.current = text;
+        modeSyncRef.current = { rows: finalRows, text };
+        setTextValue(text);
+      }
       setDirty(false);
     } catch (e) {
       const msg = e instanceof Error ? e.message : String(e);
@@ -316,6 +514,14 @@ export function CsvViewer({ path }: Props) {
   const canDeleteRow = focusedRow >= 0 && rows && rows.length > 0;
   const canDeleteCol = focusedCol >= 0 && colCount > 0;
 
+  const allRows = rows ?? [];
+  const winStart = Math.max(0, Math.min(firstVisibleRow, allRows.length) - OVERSCAN_ROWS);
+  const winEnd = Math.min(allRows.length, firstVisibleRow + visibleRowCount + OVERSCAN_ROWS);
+  const colSpan = Math.max(colCount, 1) + 1;
+  // 行号列:三个 10px 按钮 + 间距,再按最大行号位数加宽
+  const indexColWidthRem = 3 + 0.5 * String(allRows.length).length;
+  const tableWidthRem = indexColWidthRem + (colSpan - 1) * DATA_COL_WIDTH_REM;
+
   return (
     <div className="flex-1 flex flex-col min-h-0">
       {/* 子工具栏 */}
@@ -349,6 +555,12 @@ export function CsvViewer({ path }: Props) {
           </button>
         </div>
         <div className="flex-1" />
+        {loadingMore && (
+          <span className="text-xs text-fg-muted inline-flex items-center gap-1">
+            <Loader2 size={12} className="animate-spin" />
+            已载入 {allRows.length} 行…
+          </span>
+        )}
         {dirty && <span className="text-xs text-warning">● 未保存</span>}
         {mode === "table" && (
           <>
@@ -411,7 +623,7 @@ export function CsvViewer({ path }: Props) {
         <div className="w-px h-4 bg-border mx-1" />
         <button
           onClick={save}
-          disabled={!dirty || saving}
+          disabled={!dirty || saving || loadingMore}
           className="h-6 px-2 inline-flex items-center gap-1 text-xs rounded-sm bg-accent text-accent-fg disabled:opacity-40 disabled:cursor-not-allowed hover:opacity-90"
           title="保存 (Ctrl+S)"
         >
@@ -422,68 +634,43 @@ export function CsvViewer({ path }: Props) {
 
       {/* 主体 */}
       {mode === "table" ? (
-        <div className="flex-1 overflow-auto scroll-stable">
-          <table className="text-xs font-mono border-collapse">
+        <div ref={scrollRef} onScroll={syncViewport} className="flex-1 overflow-auto scroll-stable">
+          <table
+            className="text-xs font-mono border-collapse table-fixed"
+            style={{ width: `${tableWidthRem}rem` }}
+          >
+            <colgroup>
+              <col style={{ width: `${indexColWidthRem}rem` }} />
+              {Array.from({ length: colSpan - 1 }).map((_, ci) => (
+                <col key={ci} style={{ width: `${DATA_COL_WIDTH_REM}rem` }} />
+              ))}
+            </colgroup>
             <tbody>
-              {(rows ?? []).map((row, ri) => (
-                <tr key={ri} className="group hover:bg-bg-hover">
-                  <td
-                    className={clsx(
-                      "text-fg-subtle text-right px-1 py-0 border-r border-b border-border-subtle whitespace-nowrap w-14 select-none",
-                      focusedRow === ri && "bg-bg-selected text-fg",
-                    )}
-                  >
-                    <div className="flex items-center justify-end gap-1">
-                      <button
-                        onClick={() => insertRow(ri)}
-                        className="opacity-0 group-hover:opacity-100 hover:text-fg transition"
-                        title="在该行上方插入"
-                      >
-                        <ChevronUp size={10} />
-                      </button>
-                      <button
-                        onClick={() => insertRow(ri + 1)}
-                        className="opacity-0 group-hover:opacity-100 hover:text-fg transition"
-                        title="在该行下方插入"
-                      >
-                        <ChevronDown size={10} />
-                      </button>
-                      <button
-                        onClick={() => removeRow(ri)}
-                        className="opacity-0 group-hover:opacity-100 hover:text-danger transition"
-                        title="删除该行"
-                      >
-                        <Trash2 size={10} />
-                      </button>
-                      <span>{ri === 0 ? "H" : ri}</span>
-                    </div>
-                  </td>
-                  {Array.from({ length: Math.max(colCount, 1) }).map((_, ci) => (
-                    <td
-                      key={ci}
-                      className={clsx(
-                        "border-r border-b border-border-subtle p-0 align-top",
-                        ri === 0 && "bg-bg-sidebar",
-                        focusedCol === ci && ri !== 0 && "bg-bg-hover",
-                      )}
-                    >
-                      <input
-                        value={row[ci] ?? ""}
-                        onChange={(e) => updateCell(ri, ci, e.target.value)}
-                        onFocus={() => setFocused({ ri, ci })}
-                        className={clsx(
-                          "w-full px-2 py-0.5 bg-transparent border-0 outline-none",
-                          "focus:bg-bg-selected font-mono text-xs",
-                          ri === 0 ? "text-fg font-semibold" : "text-fg",
-                        )}
-                      />
-                    </td>
-                  ))}
+              {winStart > 0 && (
+                <tr aria-hidden style={{ height: winStart * rowHeight }}>
+                  <td colSpan={colSpan} className="p-0" />
                 </tr>
+              )}
+              {allRows.slice(winStart, winEnd).map((row, k) => (
+                <CsvRow
+                  key={winStart + k}
+                  ri={winStart + k}
+                  row={row}
+                  colCount={colCount}
+                  rowFocused={focusedRow === winStart + k}
+                  focusedCol={focusedCol}
+                  actions={rowActions}
+                  measureRef={k === 0 ? measureRow : undefined}
+                />
               ))}
-              {(rows ?? []).length === 0 && (
+              {winEnd < allRows.length && (
+                <tr aria-hidden style={{ height: (allRows.length - winEnd) * rowHeight }}>
+                  <td colSpan={colSpan} className="p-0" />
+                </tr>
+              )}
+              {allRows.length === 0 && (
                 <tr>
-                  <td className="text-fg-muted px-3 py-2">
+                  <td colSpan={colSpan} className="text-fg-muted px-3 py-2">
                     空文件 — 点工具栏的 "+行" 开始编辑
                   </td>
                 </tr>
@@ -26,6 +26,18 @@ interface WebviewElement extends HTMLElement {
 
 const BRIDGE_MARKER = "__MIDI_BRIDGE__";
 
+// 在打包版中 renderer 是 file://.../dist/index.html；不能用根路径,否则 Electron
+// 会解析成 file:///C:/midi_player.html。以当前页面 URL 解析才能落到 dist/。
+// 时间戳每次启动取一次:绕过上个版本留在 webview partition 里的旧页面,
+// 同一次运行里反复打开 MIDI 则复用缓存,不再每次 mount 重新读整页 HTML。
+let midiPlayerSrc: string | null = null;
+function midiPlayerUrl(): string {
+  if (midiPlayerSrc === null) {
+    midiPlayerSrc = new URL(`midi_player.html?t=${Date.now()}`, window.location.href).toString();
+  }
+  return midiPlayerSrc;
+}
+
 interface CompareWavPayload {
   files: string[];
   default: string | null;
@@ -69,10 +81,8 @@ function MidiWebview({ path }: { path: string }) {
   const [status, setStatus] = useState<"loading" | "ready" | "error">("loading");
   const [errorMsg, setErrorMsg] = useState<string | null>(null);
   const [saveToast, setSaveToast] = useState<string | null>(null);
-  // 在打包版中 renderer 是 file://.../dist/index.html；不能用根路径,否则 Electron
-  // 会解析成 file:///C:/midi_player.html。以当前页面 URL 解析才能落到 dist/。
-  // 每次 mount 加时间戳,绕过 webview partition 缓存。
-  const srcRef = useRef<string>(new URL(`midi_player.html?t=${Date.now()}`, window.location.href).toString());
+  // 只保留一个待触发的隐藏定时器:连续保存时旧定时器不会提前把新 toast 关掉,也不堆积
+  const toastTimerRef = useRef<number | null>(null);
 
   useEffect(() => {
     let cancelled = false;
@@ -86,7 +96,6 @@ function MidiWebview({ path }: { path: string }) {
     let injected = false;
     let pendingUrl: string | null = null;
     let pendingComparePayload: CompareWavPayload | null = null;
-    let comparePayloadInjected = false;
 
     // Webview → host:用 console-message 当回传通道
     const onConsole = (e: { message: string }) => {
@@ -111,7 +120,11 @@ function MidiWebview({ path }: { path: string }) {
       } else if (data.type === "midi_saved") {
         console.log(`[midi] save ${data.ok ? "ok" : "fail"}: ${data.path || data.error}`);
         setSaveToast(data.ok ? `已保存: ${data.path}` : `保存失败: ${data.error}`);
-        setTimeout(() => setSaveToast(null), data.ok ? 2500 : 6000);
+        if (toastTimerRef.current != null) window.clearTimeout(toastTimerRef.current);
+        toastTimerRef.current = window.setTimeout(() => {
+          toastTimerRef.current = null;
+          setSaveToast(null);
+        }, data.ok ? 2500 : 6000);
       } else if (data.type === "midi_export_dbg") {
         console.log("[midi] export dbg:", JSON.stringify(data));
       }
@@ -121,9 +134,8 @@ function MidiWebview({ path }: { path: string }) {
     // QWebChannel 那条路径走不通时也能拉到列表(老版 MidiExportBridge 的 JS 替身)。
     // saveMidiToCurrentPath: 写 base64 回原文件(sidecar /tools/write_midi);
     // saveMidiBase64: 弹文件保存对话框(Electron dialog) + 写入新位置。
-    const injectExportBridge = async (payload: CompareWavPayload) => {
-      if (cancelled || comparePayloadInjected) return;
-      comparePayloadInjected = true;
+    // 只生成脚本,由 tryInjectMidi 和 load_midi_url 拼成一次 executeJavaScript 发过去。
+    const exportBridgeCode = async (payload: CompareWavPayload): Promise<string> => {
       const json = JSON.stringify(payload);
       const sidecarUrl = await window.electronAPI.getSidecarUrl();
       const currentPath = path;
@@ -172,23 +184,26 @@ function MidiWebview({ path }: { path: string }) {
           },
         };
       })();`;
-      try {
-        await wv.executeJavaScript(code);
-      } catch (e) {
-        console.warn("[midi] inject exportBridge failed:", e);
-      }
+      return code;
     };
 
     const tryInjectMidi = async () => {
       if (cancelled || injected || !bridgeInstalled || !pendingUrl) return;
       injected = true;
-      // 在 load_midi_url 前先注 exportBridge,确保页内 WAV 列表加载逻辑有数据
+      const url = pendingUrl;
+      // exportBridge 和 load_midi_url 合成一段脚本,一次 IPC 往返:
+      // bridge 在前,确保页内 WAV 列表加载逻辑有数据;bridge 出错只告警,不挡 MIDI 加载
+      let code = "";
       if (pendingComparePayload) {
-        await injectExportBridge(pendingComparePayload);
+        try {
+          const bridge = await exportBridgeCode(pendingComparePayload);
+          code += `try{${bridge}}catch(e){console.warn('[midi] inject exportBridge failed:', e);}\n`;
+        } catch (e) {
+          console.warn("[midi] inject exportBridge failed:", e);
+        }
+        if (cancelled) return;
       }
-      const code = `window.postMessage({type:'load_midi_url', url: ${JSON.stringify(
-        pendingUrl,
-      )}}, '*');`;
+      code += `window.postMessage({type:'load_midi_url', url: ${JSON.stringify(url)}}, '*');`;
       wv.executeJavaScript(code).catch((err) => {
         if (cancelled) return;
         setStatus("error");
@@ -287,6 +302,11 @@ function MidiWebview({ path }: { path: string }) {
     };
   }, [path]);
 
+  // 卸载时撤掉未触发的 toast 定时器
+  useEffect(() => () => {
+    if (toastTimerRef.current != null) window.clearTimeout(toastTimerRef.current);
+  }, []);
+
   // 全局 audio:release: 释放 webview 内播放器句柄
   useEffect(() => {
     const onRelease = () => {
@@ -312,7 +332,7 @@ function MidiWebview({ path }: { path: string }) {
       </div>
       <webview
         ref={wvRef as unknown as React.Ref<HTMLElement>}
-        src={srcRef.current}
+        src={midiPlayerUrl()}
         className="flex-1 w-full bg-white"
       />
       {saveToast && (
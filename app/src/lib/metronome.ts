@@ -80,7 +80,15 @@ export class Metronome {
     this.advanceTo(audioTime);
   }
 
-  /** 释放 AudioContext。组件卸载时调一次。 */
+  /** 停调度 + 解绑 audio + 清拍,AudioContext 和 click buffer 留着给下一个查看器复用。 */
+  detach(): void {
+    this.stop();
+    this.audioEl = null;
+    this.beats = [];
+    this.nextBeatIdx = 0;
+  }
+
+  /** 释放 AudioContext。 */
   dispose(): void {
     this.stop();
     this.audioEl = null;
@@ -142,3 +150,12 @@ export class Metronome {
     return buf;
   }
 }
+
+// 全应用共用一个节拍器:AudioViewer 按文件 key 重挂载,若每个实例各自 new 一个,
+// 每切一首歌都要新建 AudioContext + 重算两段 click buffer,再 close 掉旧的。
+let _shared: Metronome | null = null;
+
+export function sharedMetronome(): Metronome {
+  if (!_shared) _shared = new Metronome();
+  return _shared;
+}
@@ -24,6 +24,9 @@ export interface MixTrackData {
 }
 
 const PEAKS_COLS = 2000;
+// 播放中位置回调的最小间隔。rAF 是 60Hz,每帧都通知会让混音台每帧重渲染 + 重画全部轨道波形;
+// 50ms(20Hz)对时间显示 / 播放头已足够顺滑。pause / stop / seek 仍立即通知。
+const POSITION_NOTIFY_INTERVAL_MS = 50;
 
 function computePeaks(buffer: AudioBuffer, columns: number): {
   mins: Float32Array;
@@ -38,14 +41,17 @@ function computePeaks(buffer: AudioBuffer, columns: number): {
   const chans: Float32Array[] = [];
   for (let c = 0; c < channels; c++) chans.push(buffer.getChannelData(c));
   const samplesPerCol = nFrames / cols;
+  // 声道均值的除法提到循环外:逐样本乘倒数,几百万样本省下同样多次除法
+  const invChannels = 1 / channels;
+  const ch0 = chans[0];
   for (let col = 0; col < cols; col++) {
     const start = Math.floor(col * samplesPerCol);
     const end = Math.min(nFrames, Math.floor((col + 1) * samplesPerCol));
     let mn = 1, mx = -1;
     for (let i = start; i < end; i++) {
-      let s = chans[0][i];
+      let s = ch0[i];
       for (let c = 1; c < channels; c++) s += chans[c][i];
-      s /= channels;
+      s *= invChannels;
       if (s < mn) mn = s;
       if (s > mx) mx = s;
     }
@@ -72,6 +78,9 @@ export class MixEngine {
   // 暂停/停止时记下的 t,下次 play 接着这里走
   private restingPosSec = 0;
 
+  // 最长轨时长缓存:只在增删轨时重算,播放 tick 里直接读,不再每帧遍历全部轨道
+  private maxDurationSec = 0;
+
   private positionListener: (sec: number, max: number) => void = () => {};
   private rafId: number | null = null;
 
@@ -104,8 +113,9 @@ export class MixEngine {
       throw new Error(`HTTP ${resp.status} 拉取失败`);
     }
     const arrayBuf = await resp.arrayBuffer();
-    // decodeAudioData 在某些实现下会"消费"输入 buffer,稳妥起见 slice 出副本
-    const audioBuf = await this.ctx.decodeAudioData(arrayBuf.slice(0));
+    // decodeAudioData 会 detach 输入 buffer;这里之后不再读它,直接交出去,
+    // 不再 slice 一份整文件副本(96k/24bit 分轨单条就上百 MB)
+    const audioBuf = await this.ctx.decodeAudioData(arrayBuf);
     const name = path.split(/[\\/]/).pop() || path;
     const peaks = computePeaks(audioBuf, PEAKS_COLS);
     const track: MixTrackData = {
@@ -118,6 +128,7 @@ export class MixEngine {
       soloed: false,
     };
     this.tracks.set(path, track);
+    this.recomputeMaxDuration();
     const g = this.ctx.createGain();
     g.gain.value = 1.0;
     g.connect(this.masterGain);
@@ -134,6 +145,7 @@ export class MixEngine {
       this.trackGains.delete(path);
     }
     this.tracks.delete(path);
+    this.recomputeMaxDuration();
     // 如果删完了仍在播,顺手停掉
     if (this.tracks.size === 0 && this.state === "playing") {
       this.stop();
@@ -163,11 +175,7 @@ export class MixEngine {
   getState(): MixState { return this.state; }
 
   maxDuration(): number {
-    let m = 0;
-    for (const t of this.tracks.values()) {
-      if (t.durationSec > m) m = t.durationSec;
-    }
-    return m;
+    return this.maxDurationSec;
   }
 
   currentPosition(): number {
@@ -226,12 +234,21 @@ export class MixEngine {
     }
     this.trackGains.clear();
     this.tracks.clear();
+    this.maxDurationSec = 0;
     try { this.masterGain.disconnect(); } catch { /* noop */ }
     this.ctx.close().catch(() => {});
   }
 
   // ---------- internal ----------
 
+  private recomputeMaxDuration(): void {
+    let m = 0;
+    for (const t of this.tracks.values()) {
+      if (t.durationSec > m) m = t.durationSec;
+    }
+    this.maxDurationSec = m;
+  }
+
   private startSourcesFromOffset(fromSec: number): void {
     this.stopAllSources();
     this.startedAtCtxTime = this.ctx.currentTime;
@@ -287,15 +304,19 @@ export class MixEngine {
 
   private startTick(): void {
     if (this.rafId != null) return;
-    const tick = () => {
+    let lastNotifyMs = -Infinity;
+    const tick = (nowMs: number) => {
       const max = this.maxDuration();
       const pos = this.currentPosition();
-      this.positionListener(pos, max);
-      // 到尾自动停
+      // 到尾自动停(stop 内部会补一次通知)
       if (this.state === "playing" && pos >= max && max > 0) {
         this.stop();
         return;
       }
+      if (nowMs - lastNotifyMs >= POSITION_NOTIFY_INTERVAL_MS) {
+        lastNotifyMs = nowMs;
+        this.positionListener(pos, max);
+      }
       this.rafId = requestAnimationFrame(tick);
     };
     this.rafId = requestAnimationFrame(tick);
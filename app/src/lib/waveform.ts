@@ -24,13 +24,10 @@ export interface WaveformCanvas {
   ampHalf: number;
 }
 
-// 波形画布的公共前奏:按 dpr 调分辨率、清屏、铺背景、画中线、算振幅半高。
-// 返回 null = 拿不到 2d context。索引映射 / 播放头由各调用方按自己的视图(全曲 / 窗口)处理。
-export function setupWaveformCanvas(
+// 按 dpr 把画布的像素尺寸对齐到 CSS 尺寸。返回 null = 拿不到 2d context。
+function fitCanvas(
   canvas: HTMLCanvasElement,
-  dark: boolean,
-  padPx: number,
-): WaveformCanvas | null {
+): { ctx: CanvasRenderingContext2D; width: number; height: number; dpr: number } | null {
   const dpr = window.devicePixelRatio || 1;
   const width = Math.floor(canvas.clientWidth * dpr);
   const height = Math.floor(canvas.clientHeight * dpr);
@@ -38,6 +35,30 @@ export function setupWaveformCanvas(
   if (canvas.height !== height) canvas.height = height;
   const ctx = canvas.getContext("2d");
   if (!ctx) return null;
+  return { ctx, width, height, dpr };
+}
+
+// 波形画布的公共前奏:按 dpr 调分辨率、清屏、铺背景、画中线、算振幅半高。
+// 返回 null = 拿不到 2d context。索引映射 / 播放头由各调用方按自己的视图(全曲 / 窗口)处理。
+export function setupWaveformCanvas(
+  canvas: HTMLCanvasElement,
+  dark: boolean,
+  padPx: number,
+): WaveformCanvas | null {
+  const fit = fitCanvas(canvas);
+  if (!fit) return null;
+  const { ctx, width, height, dpr } = fit;
+  return paintWaveformBase(ctx, width, height, dpr, dark, padPx);
+}
+
+function paintWaveformBase(
+  ctx: CanvasRenderingContext2D,
+  width: number,
+  height: number,
+  dpr: number,
+  dark: boolean,
+  padPx: number,
+): WaveformCanvas {
   ctx.clearRect(0, 0, width, height);
   ctx.fillStyle = dark ? "#1e1e1e" : "#fafafa";
   ctx.fillRect(0, 0, width, height);
@@ -55,3 +76,144 @@ export function setupWaveformCanvas(
 
   return { ctx, width, height, dpr, centerY, ampHalf };
 }
+
+// 静态波形层:背景 + 中线 + 整幅波形,"已播 / 未播"两套配色各渲染一张离屏画布。
+// 波形本身只取决于 peaks、可见切片、尺寸和主题;播放中每帧只把两层按播放头拼起来
+// (两次 drawImage),不再逐列描几千条竖线。
+export interface WaveformLayers {
+  mins: ArrayLike<number> | null;
+  i0: number;
+  slice: number;
+  width: number;
+  height: number;
+  dpr: number;
+  dark: boolean;
+  played: HTMLCanvasElement;
+  unplayed: HTMLCanvasElement;
+  // 上一次拼到哪张画布、分界在哪;-1 = 下次必须整幅拼
+  target: HTMLCanvasElement | null;
+  split: number;
+}
+
+export function createWaveformLayers(): WaveformLayers {
+  return {
+    mins: null, i0: 0, slice: 0, width: 0, height: 0, dpr: 0, dark: false,
+    played: document.createElement("canvas"),
+    unplayed: document.createElement("canvas"),
+    target: null,
+    split: -1,
+  };
+}
+
+function renderLayer(
+  layer: HTMLCanvasElement,
+  width: number,
+  height: number,
+  dpr: number,
+  dark: boolean,
+  padPx: number,
+  color: string,
+  columns: Path2D | null,
+) {
+  layer.width = width;
+  layer.height = height;
+  const ctx = layer.getContext("2d");
+  if (!ctx) return;
+  paintWaveformBase(ctx, width, height, dpr, dark, padPx);
+  if (!columns) return;
+  ctx.strokeStyle = color;
+  ctx.stroke(columns);
+}
+
+// 每个像素列一条 min→max 竖线,拼成一条 Path2D:已播 / 未播两层共用同一份几何,
+// 列 → peaks 索引的映射和缩放只算一遍
+function buildColumnsPath(
+  width: number,
+  height: number,
+  dpr: number,
+  padPx: number,
+  mins: ArrayLike<number>,
+  maxs: ArrayLike<number>,
+  i0: number,
+  slice: number,
+): Path2D | null {
+  const n = mins.length;
+  if (n === 0) return null;
+  const centerY = height / 2;
+  const ampHalf = Math.max(1, centerY - padPx * dpr);
+  const path = new Path2D();
+  for (let x = 0; x < width; x++) {
+    const idx = Math.min(n - 1, i0 + Math.floor((x / width) * slice));
+    path.moveTo(x + 0.5, centerY + mins[idx] * ampHalf);
+    path.lineTo(x + 0.5, centerY + maxs[idx] * ampHalf);
+  }
+  return path;
+}
+
+// 把 [i0, i0+slice) 这段 peaks 铺满画布宽度画到 target 上:两层按需重建,
+// 然后左侧 playedFrac 比例(截到 [0, 1])取已播层、其余取未播层。
+// incremental = 调用方保证上一帧在画布上只额外画了分界处的播放头线:这时只重拼
+// 新旧分界之间的一条竖带(含旧播放头线),其余像素原样保留。
+// 返回画布几何和本次实际重拼的列区间 [x0, x1),供调用方叠加播放头等(有别的叠层的
+// 调用方据此只在这条竖带里补画);null = 拿不到 2d context。
+export function drawWaveformLayers(
+  target: HTMLCanvasElement,
+  layers: WaveformLayers,
+  mins: ArrayLike<number>,
+  maxs: ArrayLike<number>,
+  i0: number,
+  slice: number,
+  dark: boolean,
+  padPx: number,
+  playedFrac: number,
+  incremental = false,
+): {
+  ctx: CanvasRenderingContext2D;
+  width: number;
+  height: number;
+  dpr: number;
+  x0: number;
+  x1: number;
+} | null {
+  const fit = fitCanvas(target);
+  if (!fit) return null;
+  const { ctx, width, height, dpr } = fit;
+  if (
+    layers.mins !== mins || layers.i0 !== i0 || layers.slice !== slice
+    || layers.width !== width || layers.height !== height
+    || layers.dpr !== dpr || layers.dark !== dark
+  ) {
+    const columns = buildColumnsPath(width, height, dpr, padPx, mins, maxs, i0, slice);
+    renderLayer(layers.played, width, height, dpr, dark, padPx,
+      dark ? "#3794ff" : "#007acc", columns);
+    renderLayer(layers.unplayed, width, height, dpr, dark, padPx,
+      dark ? "#6a6a6a" : "#9ca3af", columns);
+    layers.mins = mins;
+    layers.i0 = i0;
+    layers.slice = slice;
+    layers.width = width;
+    layers.height = height;
+    layers.dpr = dpr;
+    layers.dark = dark;
+    layers.target = null;
+    layers.split = -1;
+  }
+  if (width === 0 || height === 0) return { ...fit, x0: 0, x1: width };
+  const split = Math.max(0, Math.min(width, Math.floor(playedFrac * width)));
+  // 画布尺寸一变内容就被清空,但那时层也必然重建过(target 已置空),走整幅
+  let x0 = 0;
+  let x1 = width;
+  if (incremental && layers.target === target && layers.split >= 0) {
+    const margin = Math.ceil(2 * dpr) + 1;
+    x0 = Math.max(0, Math.min(layers.split, split) - margin);
+    x1 = Math.min(width, Math.max(layers.split, split) + margin);
+  }
+  const blit = (layer: HTMLCanvasElement, a: number, b: number) => {
+    if (a < b) ctx.drawImage(layer, a, 0, b - a, height, a, 0, b - a, height);
+  };
+  blit(layers.played, x0, Math.min(x1, split));
+  blit(layers.unplayed, Math.max(x0, split), x1);
+  layers.target = target;
+  layers.split = split;
+  return { ...fit, x0, x1 };
+}
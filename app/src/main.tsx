@@ -1,6 +1,5 @@
 import React from "react";
 import ReactDOM from "react-dom/client";
-import "./monaco-setup";
 import App from "./App";
 import { MixConsoleStandalone } from "./MixConsoleStandalone";
 import "./styles.css";
@@ -5,16 +5,21 @@ All routes under /tools/*. A class (read-only) is GET, B class (write) is POST.
 Pydantic schemas in sidecar.schemas keep contracts stable for the renderer.
 """
 
+import asyncio
 import csv
+import hashlib
+import itertools
 import json
 import mimetypes
 import os
 import shutil
+import tempfile
 import time
+from contextlib import asynccontextmanager
 from typing import List
 
 import httpx
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse
 
@@ -63,7 +68,14 @@ from sidecar.schemas import (
 from sidecar.logic_checker import LogicChecker
 
 
-app = FastAPI(title="Audio QC Sidecar", version="0.1.0")
+@asynccontextmanager
+async def _lifespan(_app: FastAPI):
+    yield
+    # 退出时释放进程内共享的长连接资源
+    await _close_llm_async_client()
+
+
+app = FastAPI(title="Audio QC Sidecar", version="0.1.0", lifespan=_lifespan)
 
 # Local sidecar; renderer hits 127.0.0.1, CORS open is fine.
 app.add_middleware(
@@ -245,13 +257,41 @@ def sheet_mode():
     }
 
 
+_llm_http: httpx.AsyncClient | None = None
+
+
+def _llm_async_client() -> httpx.AsyncClient:
+    """进程内共享的 LLM AsyncClient。
+
+    agent 一次任务几十轮 completion,每轮新建 client = 每轮重新 TCP + TLS 握手;
+    共享后走 keep-alive 连接池。closed 了(理论上不会)就重建。
+    """
+    global _llm_http
+    if _llm_http is None or _llm_http.is_closed:
+        _llm_http = httpx.AsyncClient(
+            timeout=httpx.Timeout(300.0, connect=10.0), trust_env=False,
+        )
+    return _llm_http
+
+
+async def _close_llm_async_client() -> None:
+    """进程退出时关掉共享 client,释放 keep-alive 连接(也免得 httpx 报未关闭)。"""
+    global _llm_http
+    if _llm_http is not None:
+        await _llm_http.aclose()
+        _llm_http = None
+
+
 @app.post("/agent/completion")
-def agent_completion(body: dict):
+async def agent_completion(body: dict):
     """Proxy LLM call with tool support for the Electron agent loop.
 
     Body: {messages, tools, tool_choice?}. Returns the raw assistant message dict
     (`content` + optional `tool_calls`). Keeps the llm api_key in sidecar,
     Electron main never sees it.
+
+    async:一次 completion 连重试退避可能挂几分钟,同步版会占住 threadpool
+    的一个 worker;并发多轮时把 /files/raw、/tools/* 这些同步路由饿住。
     """
     cfg = reload_config().llm
     if not cfg.endpoint or not cfg.api_key:
@@ -285,28 +325,28 @@ def agent_completion(body: dict):
     data: dict | None = None
     for attempt in range(max_retries + 1):
         try:
-            with httpx.Client(timeout=httpx.Timeout(300.0, connect=10.0), trust_env=False) as client:
-                r = client.post(url, json=payload, headers=headers)
-                if r.status_code >= 400:
-                    if r.status_code in RETRYABLE and attempt < max_retries:
-                        ra_hdr = r.headers.get("retry-after")
-                        try:
-                            ra = float(ra_hdr) if ra_hdr else None
-                        except ValueError:
-                            ra = None
-                        delay = max(0.5, ra if ra is not None else min(30.0, 1.5 * (2 ** attempt)))
-                        print(f"[agent_completion] HTTP {r.status_code}, retry in {delay:.1f}s ({attempt+1}/{max_retries+1})", flush=True)
-                        time.sleep(delay)
-                        continue
-                    raise HTTPException(status_code=502, detail=f"LLM HTTP {r.status_code}: {r.text[:500]}")
-                data = r.json()
-                break
-        except (httpx.TimeoutException, httpx.ConnectError) as e:
+            r = await _llm_async_client().post(url, json=payload, headers=headers)
+            if r.status_code >= 400:
+                if r.status_code in RETRYABLE and attempt < max_retries:
+                    ra_hdr = r.headers.get("retry-after")
+                    try:
+                        ra = float(ra_hdr) if ra_hdr else None
+                    except ValueError:
+                        ra = None
+                    delay = max(0.5, ra if ra is not None else min(30.0, 1.5 * (2 ** attempt)))
+                    print(f"[agent_completion] HTTP {r.status_code}, retry in {delay:.1f}s ({attempt+1}/{max_retries+1})", flush=True)
+                    await asyncio.sleep(delay)
+                    continue
+                raise HTTPException(status_code=502, detail=f"LLM HTTP {r.status_code}: {r.text[:500]}")
+            data = r.json()
+            break
+        except (httpx.TimeoutException, httpx.ConnectError, httpx.RemoteProtocolError) as e:
+            # RemoteProtocolError:连接池里的 keep-alive 连接被代理端悄悄关掉,重试换新连接
             last_err = f"{type(e).__name__}: {e}"
             if attempt < max_retries:
                 delay = min(30.0, 1.5 * (2 ** attempt))
                 print(f"[agent_completion] {type(e).__name__}, retry in {delay:.1f}s ({attempt+1}/{max_retries+1})", flush=True)
-                time.sleep(delay)
+                await asyncio.sleep(delay)
                 continue
             raise HTTPException(status_code=502, detail=f"LLM request failed: {last_err}") from e
         except httpx.HTTPError as e:
@@ -402,13 +442,12 @@ def tool_check_workspace(root: str = Query(...)):
 def tool_get_audio_metadata(path: str = Query(...)):
     if not os.path.isfile(path):
         raise HTTPException(status_code=400, detail=f"file not found: {path}")
-    import soundfile as sf
     try:
-        with sf.SoundFile(path) as f:
-            sr = int(f.samplerate)
-            ch = int(f.channels)
-            subtype = str(f.subtype)
-            frames = int(f.frames)
+        info = LogicChecker.get_wav_info(path)
+        sr = int(info.samplerate)
+        ch = int(info.channels)
+        subtype = str(info.subtype)
+        frames = int(info.frames)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"read failed: {e}")
     return AudioMetadata(
@@ -422,22 +461,22 @@ def tool_list_dir(path: str = Query(..., description="absolute directory path"))
     """列举单层目录，供前端文件树懒加载。文件夹优先 + 名称序。"""
     if not os.path.isdir(path):
         raise HTTPException(status_code=400, detail=f"not a directory: {path}")
+    # scandir 带回的目录项类型(Windows 上连 stat 也是)直接复用,不再每项 isdir + getsize 两次 stat
+    entries: List[DirEntry] = []
     try:
-        names = os.listdir(path)
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir()
+                    size = 0 if is_dir else entry.stat().st_size
+                except OSError:
+                    continue
+                ext = "" if is_dir else os.path.splitext(entry.name)[1].lstrip(".").lower()
+                entries.append(DirEntry(
+                    path=entry.path, name=entry.name, is_dir=is_dir, size_bytes=size, ext=ext,
+                ))
     except OSError as e:
         raise HTTPException(status_code=400, detail=f"list failed: {e}")
-    entries: List[DirEntry] = []
-    for name in names:
-        full = os.path.join(path, name)
-        try:
-            is_dir = os.path.isdir(full)
-            size = 0 if is_dir else os.path.getsize(full)
-        except OSError:
-            continue
-        ext = "" if is_dir else os.path.splitext(name)[1].lstrip(".").lower()
-        entries.append(DirEntry(
-            path=full, name=name, is_dir=is_dir, size_bytes=size, ext=ext,
-        ))
     entries.sort(key=lambda e: (not e.is_dir, e.name.lower()))
     return ListDirOut(path=path, entries=entries)
 
@@ -446,7 +485,6 @@ def tool_list_dir(path: str = Query(..., description="absolute directory path"))
 def tool_list_song_files(song_path: str = Query(...)):
     if not os.path.isdir(song_path):
         raise HTTPException(status_code=400, detail=f"not a directory: {song_path}")
-    import soundfile as sf
     files: List[FileEntry] = []
     for dirpath, _, filenames in os.walk(song_path):
         for name in sorted(filenames):
@@ -460,14 +498,14 @@ def tool_list_song_files(song_path: str = Query(...)):
             audio_meta = None
             if is_audio:
                 try:
-                    with sf.SoundFile(full) as f:
-                        sr = int(f.samplerate)
-                        frames = int(f.frames)
-                        audio_meta = AudioMetadata(
-                            path=full, samplerate=sr, channels=int(f.channels),
-                            subtype=str(f.subtype), frames=frames,
-                            duration_seconds=frames / sr if sr else 0.0,
-                        )
+                    info = LogicChecker.get_wav_info(full)
+                    sr = int(info.samplerate)
+                    frames = int(info.frames)
+                    audio_meta = AudioMetadata(
+                        path=full, samplerate=sr, channels=int(info.channels),
+                        subtype=str(info.subtype), frames=frames,
+                        duration_seconds=frames / sr if sr else 0.0,
+                    )
                 except Exception:
                     pass
             files.append(FileEntry(
@@ -477,27 +515,74 @@ def tool_list_song_files(song_path: str = Query(...)):
     return ListSongFilesOut(song_path=song_path, files=files)
 
 
+# 不超过这个大小的 CSV 整个读进来(二进制读 + 一次 decode),先判一下是不是"简单"格式
+_CSV_FAST_PATH_MAX_BYTES = 32 * 1024 * 1024
+
+
+def _read_simple_csv_text(path: str):
+    """文件够小且"简单"(无引号、无 \r)时返回整段解码文本,否则返回 None。
+
+    判断只是一次 C 层的子串扫描;不简单的文件这段文本随即丢弃,交给 csv.reader 流式读。
+    """
+    if os.path.getsize(path) > _CSV_FAST_PATH_MAX_BYTES:
+        return None
+    with open(path, "rb") as f:
+        text = f.read().decode("utf-8-sig")
+    if '"' in text or "\r" in text:
+        return None
+    return text
+
+
+def _split_simple_csv_window(text: str, start: int, size: int):
+    """简单 CSV 直接按 \n / , 切,结果与 csv.reader 逐行一致(空行 → [])。返回 (skipped, rows, rest)。
+
+    不整段 split:总行数用 str.count 在 C 层数出来,窗口起点用 str.find 逐行跳过,
+    只把窗口里的行切成新字符串;分块加载反复请求同一个大文件时内存只随窗口大小走。
+    """
+    total = text.count("\n")
+    if text and not text.endswith("\n"):
+        total += 1  # 末行没有换行也算一行;末尾换行 / 空文件不多算
+    s0 = min(max(0, start), total)
+    take = min(max(0, size), total - s0)
+    pos = 0
+    for _ in range(s0):
+        pos = text.find("\n", pos) + 1
+    rows: List[List[str]] = []
+    for _ in range(take):
+        nl = text.find("\n", pos)
+        line = text[pos:] if nl == -1 else text[pos:nl]
+        rows.append(line.split(",") if line else [])
+        pos = nl + 1
+    return s0, rows, total - s0 - take
+
+
 @app.get("/tools/read_csv", response_model=ReadCsvOut)
 def tool_read_csv(path: str = Query(...), start: int = 0, end: int = 1000):
     if not os.path.isfile(path):
         raise HTTPException(status_code=400, detail=f"file not found: {path}")
-    rows: List[List[str]] = []
-    total = 0
-    truncated = False
+    size = max(0, end - start)
+    try:
+        text = _read_simple_csv_text(path)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"read failed: {e}")
+    if text is not None:
+        skipped, rows, rest = _split_simple_csv_window(text, start, size)
+        return ReadCsvOut(
+            path=path, rows=rows, total_rows=skipped + len(rows) + rest, truncated=rest > 0,
+        )
     try:
         with open(path, "r", encoding="utf-8-sig", newline="") as f:
             reader = csv.reader(f)
-            for i, row in enumerate(reader):
-                total += 1
-                if i < start:
-                    continue
-                if len(rows) >= (end - start):
-                    truncated = True
-                    continue
-                rows.append(row)
+            # 窗口前 / 窗口 / 窗口后三段都交给 islice 在 C 层推进 csv.reader,
+            # 不再每行回到 Python 做计数和区间判断;窗口外的行只计数不保留
+            skipped = sum(1 for _ in itertools.islice(reader, max(0, start)))
+            rows: List[List[str]] = list(itertools.islice(reader, size))
+            rest = sum(1 for _ in reader)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"read failed: {e}")
-    return ReadCsvOut(path=path, rows=rows, total_rows=total, truncated=truncated)
+    return ReadCsvOut(
+        path=path, rows=rows, total_rows=skipped + len(rows) + rest, truncated=rest > 0,
+    )
 
 
 @app.get("/tools/read_text", response_model=ReadTextOut)
@@ -583,9 +668,12 @@ def tool_write_csv(body: WriteCsvIn):
 
 @app.post("/tools/write_text", response_model=WriteResultOut)
 def tool_write_text(body: WriteTextIn):
+    # 一次 encode 后二进制写,等价于 utf-8 + newline="" 的文本写,但不走 TextIOWrapper 分段编码
+    data = body.content.encode("utf-8")
+
     def _do(tmp: str):
-        with open(tmp, "w", encoding="utf-8", newline="") as f:
-            f.write(body.content)
+        with open(tmp, "wb") as f:
+            f.write(data)
     size = _atomic_write(body.path, _do)
     return WriteResultOut(path=body.path, bytes_written=size)
 
@@ -679,16 +767,28 @@ def tool_shift_midi_per_track_save(body: dict):
     return WriteResultOut(path=path, bytes_written=size)
 
 
+def _file_etag(st: os.stat_result) -> str:
+    """mtime_ns + size 拼的强 ETag。保存文件必改 mtime,够区分新旧字节。"""
+    return f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+
+
 @app.get("/files/raw")
-def files_raw(path: str = Query(..., description="absolute file path")):
+def files_raw(request: Request, path: str = Query(..., description="absolute file path")):
     """流式返回任意本地文件的字节内容。FileResponse 自带 Range 支持，
-    供前端 <audio>/<video> / fetch decodeAudioData 等使用。
+    供前端 <audio>/<video> / fetch decodeAudioData 等使用。If-Range 比对的
+    也是下面这个 ETag:断点续传时文件若已改写,回整份 200 而不是拼错的 206。
 
-    返回 Cache-Control: no-store —— Chromium webview 默认会缓存普通 GET 响应,
-    保存 midi/wav 后重新打开看到旧字节就是这个 cache 在搞鬼,显式禁用。
+    Cache-Control: no-cache + ETag —— webview 可以缓存,但每次都要带
+    If-None-Match 回来验证;文件没变回 304 不传 body,保存 midi/wav 后
+    mtime 变了 ETag 跟着变,不会看到旧字节。
     """
     if not os.path.isfile(path):
         raise HTTPException(status_code=404, detail=f"file not found: {path}")
+    etag = _file_etag(os.stat(path))
+    cache_headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (t.strip() for t in if_none_match.split(",")):
+        return Response(status_code=304, headers=cache_headers)
     media_type, _ = mimetypes.guess_type(path)
     if not media_type:
         ext = os.path.splitext(path)[1].lower()
@@ -696,10 +796,100 @@ def files_raw(path: str = Query(..., description="absolute file path")):
             media_type = "audio/midi"
         else:
             media_type = "application/octet-stream"
-    resp = FileResponse(path, media_type=media_type, filename=os.path.basename(path))
-    resp.headers["Cache-Control"] = "no-store, no-cache, must-revalidate"
-    resp.headers["Pragma"] = "no-cache"
-    return resp
+    return FileResponse(
+        path,
+        media_type=media_type,
+        filename=os.path.basename(path),
+        headers=cache_headers,
+    )
+
+
+_PEAKS_DECIMALS = 4
+# min / max 按行块交替归约的块大小(采样数,float32 约 1 MB,放得进 L2)
+_PEAKS_CHUNK_SAMPLES = 1 << 18
+
+
+# peaks 磁盘缓存最多保留的文件数,超出按修改时间删最旧的(4000 列 float32 一份约 32 KB)
+_PEAKS_CACHE_MAX_FILES = 256
+
+
+def _peaks_cache_path(path: str, columns: int) -> str:
+    """peaks 磁盘缓存文件名:按 (绝对路径, columns) 哈希。
+
+    mtime / size 存在文件里、读时比对:同一个文件改写后新结果直接覆盖旧条目,不留孤儿。
+    """
+    key = f"{os.path.abspath(path)}\0{columns}"
+    name = hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+    return str(paths.peaks_cache_dir() / f"{name}.npz")
+
+
+def _load_peaks_cache(cache_file: str, path: str, st: os.stat_result):
+    """命中且 mtime / size 对得上返回 AudioPeaksOut;没有 / 过期 / 读坏了返回 None(照常重新解码)。"""
+    import numpy as np
+    try:
+        with np.load(cache_file) as z:
+            if int(z["mtime_ns"]) != st.st_mtime_ns or int(z["size"]) != st.st_size:
+                return None
+            sr = int(z["sr"])
+            frames = int(z["frames"])
+            # 落盘是 float32,回 float64 再按同样精度取整,与首次解码返回的数值一致
+            mins = np.round(z["mins"].astype(np.float64), _PEAKS_DECIMALS)
+            maxs = np.round(z["maxs"].astype(np.float64), _PEAKS_DECIMALS)
+            return AudioPeaksOut(
+                path=path, samplerate=sr, channels=int(z["ch"]), frames=frames,
+                duration_seconds=float(frames) / float(sr),
+                columns=int(mins.size), mins=mins.tolist(), maxs=maxs.tolist(),
+            )
+    except Exception:
+        return None
+
+
+def _prune_peaks_cache(cache_dir: str) -> None:
+    """缓存目录超过 _PEAKS_CACHE_MAX_FILES 个条目时删掉最旧的(被删的文件下次打开重新解码即可)。"""
+    try:
+        with os.scandir(cache_dir) as it:
+            # 只数成品 .npz;别的请求正在写的 *.tmp 不碰
+            entries = [(e.stat().st_mtime_ns, e.path) for e in it if e.name.endswith(".npz")]
+    except OSError:
+        return
+    if len(entries) <= _PEAKS_CACHE_MAX_FILES:
+        return
+    entries.sort()
+    for _, old in entries[:len(entries) - _PEAKS_CACHE_MAX_FILES]:
+        try:
+            os.remove(old)
+        except OSError:
+            pass
+
+
+def _store_peaks_cache(
+    cache_file: str, st: os.stat_result, sr: int, ch: int, frames: int, mins, maxs,
+) -> None:
+    """原子写入 peaks 缓存(float32)并裁剪目录;写失败只打日志,不影响本次返回。
+
+    tmp 名每次唯一:同一 (path, columns) 的并发请求(混音台同时拉多轨)各写各的,
+    不会互相 replace / 删掉对方写了一半的文件。
+    """
+    import numpy as np
+    tmp = None
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(cache_file), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.savez(
+                f, mtime_ns=st.st_mtime_ns, size=st.st_size, sr=sr, ch=ch, frames=frames,
+                mins=mins.astype(np.float32), maxs=maxs.astype(np.float32),
+            )
+        os.replace(tmp, cache_file)
+    except Exception as e:
+        print(f"[get_audio_peaks] cache write failed: {e}", flush=True)
+        if tmp is not None:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+        return
+    _prune_peaks_cache(os.path.dirname(cache_file))
 
 
 @app.get("/tools/get_audio_peaks", response_model=AudioPeaksOut)
@@ -707,10 +897,16 @@ def tool_get_audio_peaks(path: str = Query(...), columns: int = 4000):
     """服务端预算 min/max 波形包络。前端只画图，不再 decodeAudioData，避免 OOM。
 
     columns 默认 4000；过大没意义（屏幕宽度撑死 ~3000px），过小波形不准。
+    结果按 (path, columns) 落盘缓存(mtime / size 不符即重算),来回切同几首歌不用每次重新解码整个文件。
     """
     if not os.path.isfile(path):
         raise HTTPException(status_code=400, detail=f"file not found: {path}")
     columns = max(1, min(8000, int(columns)))
+    st = os.stat(path)
+    cache_file = _peaks_cache_path(path, columns)
+    cached = _load_peaks_cache(cache_file, path, st)
+    if cached is not None:
+        return cached
 
     import numpy as np
     import soundfile as sf
@@ -720,29 +916,52 @@ def tool_get_audio_peaks(path: str = Query(...), columns: int = 4000):
             sr = int(f.samplerate)
             ch = int(f.channels)
             frames = int(f.frames)
-            data = f.read(dtype="float32", always_2d=True)
+            if frames <= 0:
+                return AudioPeaksOut(
+                    path=path, samplerate=sr, channels=ch, frames=frames,
+                    duration_seconds=0.0, columns=0, mins=[], maxs=[],
+                )
+            # 列宽只依赖头里的 frames,先算好再解码:尾部凑不满一列的零头不必解码
+            samples_per_col = max(1, frames // columns)
+            actual_cols = max(1, min(columns, frames // samples_per_col))
+            # 归约结果直接写进预分配的 (2, cols) float64,最后原地取整
+            out = np.empty((2, actual_cols), dtype=np.float64)
+            # 按整列分块流式解码,只复用一块 ~1 MB/声道的 float32 缓冲,峰值内存不随文件长度涨。
+            # numpy 没有单遍 minmax:每块里 min / max 接着做,max 那遍读的还是刚进缓存的数据
+            rows_per_chunk = max(1, _PEAKS_CHUNK_SAMPLES // samples_per_col)
+            buf = np.empty((rows_per_chunk * samples_per_col, ch), dtype=np.float32)
+            done = 0
+            while done < actual_cols:
+                rows = min(rows_per_chunk, actual_cols - done)
+                block = f.read(rows * samples_per_col, dtype="float32", always_2d=True,
+                               out=buf[:rows * samples_per_col])
+                # 头里的 frames 比实际能解出来的多(截断文件):按真正读到的整列收尾
+                rows = min(rows, block.shape[0] // samples_per_col)
+                if rows == 0:
+                    break
+                # 多声道时 block[:, 0] 是跨步视图,先拷成连续 float32 再 reshape
+                chan0 = np.ascontiguousarray(block[:rows * samples_per_col, 0])
+                dst = slice(done, done + rows)
+                if samples_per_col == 1:
+                    # 短音频(frames < 2*columns):一列一个采样,min == max 就是采样本身,不用归约
+                    out[0, dst] = chan0
+                    out[1, dst] = chan0
+                else:
+                    arr = chan0.reshape(rows, samples_per_col)
+                    arr.min(axis=1, out=out[0, dst])
+                    arr.max(axis=1, out=out[1, dst])
+                done += rows
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"read failed: {e}")
 
-    if data.size == 0 or frames <= 0:
-        return AudioPeaksOut(
-            path=path, samplerate=sr, channels=ch, frames=frames,
-            duration_seconds=0.0, columns=0, mins=[], maxs=[],
-        )
-
-    chan0 = data[:, 0]
-    samples_per_col = max(1, frames // columns)
-    actual_cols = min(columns, frames // samples_per_col)
-    if actual_cols <= 0:
-        actual_cols = 1
-    trim = samples_per_col * actual_cols
-    arr = chan0[:trim].reshape(actual_cols, samples_per_col)
-    mins = arr.min(axis=1).astype(float).tolist()
-    maxs = arr.max(axis=1).astype(float).tolist()
+    # 量化到 1e-4(约 15 bit,远小于一个像素):float32 直接 tolist 会序列化成
+    # 0.8999999761581421 这种 18 位小数,取整后 JSON 体积约降到 1/3,解析也更快
+    lo, hi = np.round(out[:, :done], _PEAKS_DECIMALS, out=out[:, :done])
+    _store_peaks_cache(cache_file, st, sr, ch, frames, lo, hi)
     return AudioPeaksOut(
         path=path, samplerate=sr, channels=ch, frames=frames,
         duration_seconds=float(frames) / float(sr),
-        columns=actual_cols, mins=mins, maxs=maxs,
+        columns=done, mins=lo.tolist(), maxs=hi.tolist(),
     )
 
 
@@ -757,7 +976,6 @@ _AUDIO_EXTS = (".wav", ".mp3", ".flac", ".ogg", ".m4a")
 def tool_get_audio_durations(body: GetAudioDurationsIn):
     """批量返回路径 → {frames, samplerate, duration_seconds}。读不出的、非音频的为 None。
     前端拿 frames+samplerate 做整数级别同帧比较。"""
-    import soundfile as sf
     from sidecar.schemas import AudioDurationItem
     out: dict[str, AudioDurationItem | None] = {}
     for p in body.paths:
@@ -768,9 +986,9 @@ def tool_get_audio_durations(body: GetAudioDurationsIn):
             out[p] = None
             continue
         try:
-            with sf.SoundFile(p) as f:
-                sr = int(f.samplerate)
-                frames = int(f.frames)
+            info = LogicChecker.get_wav_info(p)
+            sr = int(info.samplerate)
+            frames = int(info.frames)
             if sr <= 0:
                 out[p] = None
             else:
@@ -531,15 +531,19 @@ def _exec_create_dir(op: dict, result: AutofixResult) -> None:
 
 
 def _atomic_write_text(path: str, content: str) -> int:
-    """全文 UTF-8 原子写(tmp + os.replace,失败清 tmp);newline="" 不转换换行。
-    父目录不存在抛 FileNotFoundError。返回写入字节数。write_text / text_edit 共用。"""
+    """全文 UTF-8 原子写(tmp + os.replace,失败清 tmp);不转换换行。
+    父目录不存在抛 FileNotFoundError。返回写入字节数。write_text / text_edit 共用。
+
+    一次 encode 成 bytes 后二进制写:不走 TextIOWrapper 的分段编码,字节数直接取
+    len,不再 stat 一遍。"""
     parent = os.path.dirname(path) or "."
     if not os.path.isdir(parent):
         raise FileNotFoundError(f"父目录不存在:{parent}")
+    data = content.encode("utf-8")
     tmp = path + ".__write_tmp__"
     try:
-        with open(tmp, "w", encoding="utf-8", newline="") as f:
-            f.write(content)
+        with open(tmp, "wb") as f:
+            f.write(data)
         os.replace(tmp, path)
     except Exception:
         # 失败时清 tmp,别留 .__write_tmp__ 在工作区污染文件树
@@ -549,7 +553,7 @@ def _atomic_write_text(path: str, content: str) -> int:
             except OSError:
                 pass
         raise
-    return os.path.getsize(path)
+    return len(data)
 
 
 def _exec_write_text(op: dict, result: AutofixResult) -> None:
@@ -602,7 +606,9 @@ def _exec_text_edit(op: dict, result: AutofixResult) -> None:
     else:
         new_text = text.replace(old_string, new_string, 1)
 
-    _atomic_write_text(path, new_text)
+    # 新旧内容相同(old_string == new_string)就不重写文件,mtime 也不动
+    if new_text != text:
+        _atomic_write_text(path, new_text)
     result.executed.append({
         "type": "text_edit",
         "path": path,
@@ -615,12 +621,12 @@ def _read_wav_metas(wav_files):
     metas = []
     for fp in wav_files:
         try:
-            with sf.SoundFile(fp) as f:
-                sr = int(f.samplerate)
-                ch = int(f.channels)
-                frames = int(f.frames)
-                if sr <= 0 or frames < 0:
-                    raise RuntimeError("采样率或帧数无效")
+            info = LogicChecker.get_wav_info(fp)
+            sr = int(info.samplerate)
+            ch = int(info.channels)
+            frames = int(info.frames)
+            if sr <= 0 or frames < 0:
+                raise RuntimeError("采样率或帧数无效")
         except Exception as e:
             return [], f"无法读取 WAV: {fp} - {e}"
         metas.append((fp, sr, ch, frames))
@@ -645,9 +651,11 @@ def _pad_to_target_frames(metas, target_frames):
                     subtype=in_f.subtype,
                 ) as out_f:
                     block = 65536
+                    # 预分配一块读缓冲反复复用,避免每个 block 都新分配一个 ndarray
+                    buf = np.empty((block, ch), dtype=np.int32)
                     while True:
-                        data = in_f.read(block, dtype="int32", always_2d=True)
-                        if data.size == 0:
+                        data = in_f.read(out=buf)
+                        if data.shape[0] == 0:
                             break
                         out_f.write(data)
 
@@ -1,9 +1,30 @@
+import functools
 import os
 import re
 import unicodedata
 import soundfile as sf
 
 
+@functools.lru_cache(maxsize=4096)
+def _wav_info_cached(path, mtime_ns, size):
+    # mtime_ns / size 只参与 key:文件被改写(补空白 / 替换)后自动失效
+    return sf.info(path)
+
+
+def _read_text_lines(path):
+    """二进制读 + 一次 utf-8-sig decode,切行结果与文本模式 readlines() 一致。
+
+    只认 \r\n / \r / \n 三种换行(与通用换行模式相同);不用 str.splitlines,
+    它还会在 \x0c、\u2028 等字符处断行,单元格里混进这些字符时行号和报错都会变。
+    """
+    with open(path, "rb") as f:
+        text = f.read().decode("utf-8-sig")
+    lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    if lines[-1] == "":
+        lines.pop()  # 末尾换行 / 空文件不算一行
+    return lines
+
+
 class LogicChecker:
     """
     静态逻辑检查类，保持纯函数风格，便于复用。
@@ -34,6 +55,7 @@ class LogicChecker:
     MIDI_EXPECTED_SUFFIXES = ["Vocal_midi", "Mix_midi"]
     MIDI_ALLOWED_SUFFIXES = ["BG_midi"]
     CSV_EXPECTED_SUFFIXES = ["Beat", "Structure"]
+    STRUCTURE_TIME_PATTERN = re.compile(r"^\d{2}:\d{2}$")
 
     @staticmethod
     def normalize_simple_name(name):
@@ -211,21 +233,31 @@ class LogicChecker:
         except:
             return []
 
+    @staticmethod
+    def get_wav_info(wav_path):
+        """读 WAV 头信息(sf.info),按 (path, mtime, size) 缓存。读失败照常抛异常。
+
+        一次全量检查里同一个 WAV 会被格式 / 最短时长 / 时长一致性各查一遍,
+        前端又会反复拉 metadata;缓存后每个文件只开一次头。
+        """
+        st = os.stat(wav_path)
+        return _wav_info_cached(os.path.abspath(wav_path), st.st_mtime_ns, st.st_size)
+
     @staticmethod
     def check_wav_format(wav_path):
         try:
             # 简单的快速检查，不读取全部数据
-            with sf.SoundFile(wav_path) as f:
-                errors = []
-                if f.samplerate != 96000:
-                    errors.append(f"采样率 {f.samplerate} != 96000")
-                if f.channels != 2:
-                    errors.append(f"声道 {f.channels} != 2")
-                if f.subtype != "PCM_24":
-                    errors.append(f"位深 {f.subtype} != PCM_24")
-
-                if errors:
-                    return f"[音频格式错误] ({'; '.join(errors)})"
+            info = LogicChecker.get_wav_info(wav_path)
+            errors = []
+            if info.samplerate != 96000:
+                errors.append(f"采样率 {info.samplerate} != 96000")
+            if info.channels != 2:
+                errors.append(f"声道 {info.channels} != 2")
+            if info.subtype != "PCM_24":
+                errors.append(f"位深 {info.subtype} != PCM_24")
+
+            if errors:
+                return f"[音频格式错误] ({'; '.join(errors)})"
             return None
         except Exception as e:
             return f"[无法读取WAV] ({e})"
@@ -242,12 +274,12 @@ class LogicChecker:
     def get_wav_frames_and_rate(wav_path):
         """读取 WAV 总帧数与采样率。失败返回 (None, None)。"""
         try:
-            with sf.SoundFile(wav_path) as f:
-                sr = int(f.samplerate)
-                frames = int(f.frames)
-                if sr <= 0 or frames < 0:
-                    return None, None
-                return frames, sr
+            info = LogicChecker.get_wav_info(wav_path)
+            sr = int(info.samplerate)
+            frames = int(info.frames)
+            if sr <= 0 or frames < 0:
+                return None, None
+            return frames, sr
         except Exception:
             return None, None
 
@@ -508,7 +540,7 @@ class LogicChecker:
         item = os.path.basename(song_path)
 
         # 1. 检查文件夹命名
-        match = re.match(r"^(.+?)_(.+?)_(.+?)$", item)
+        match = LogicChecker.SONG_FOLDER_PATTERN.match(item)
         if not match:
             add_error(song_path, f"[命名错误] 文件夹须为 '作者_歌曲名_扒谱者'")
             song_name = item  # Fallback
@@ -630,8 +662,7 @@ class LogicChecker:
         beat_path = os.path.join(csv_root, f"{song_name}_Beat.csv")
         if os.path.exists(beat_path):
             try:
-                with open(beat_path, "r", encoding="utf-8-sig") as f:
-                    lines = f.readlines()
+                lines = _read_text_lines(beat_path)
                 if not lines:
                     add_error(beat_path, "[内容错误] 文件为空")
                 else:
@@ -663,8 +694,7 @@ class LogicChecker:
         allowed_labels = {"Intro", "Verse", "Chorus", "Bridge", "Outro"}
         if os.path.exists(structure_path):
             try:
-                with open(structure_path, "r", encoding="utf-8-sig") as f:
-                    lines = f.readlines()
+                lines = _read_text_lines(structure_path)
                 if not lines:
                     add_error(structure_path, "[内容错误] 文件为空")
                 else:
@@ -691,7 +721,7 @@ class LogicChecker:
                             )
                         for t in parts:
                             # 检查时间格式 mm:ss
-                            if not re.match(r"^\d{2}:\d{2}$", t):
+                            if not LogicChecker.STRUCTURE_TIME_PATTERN.match(t):
                                 add_error(
                                     structure_path,
                                     f"[时间格式错误] 第{idx}行 {t} 应为mm:ss格式",
@@ -9,6 +9,7 @@ from io import BytesIO
 from typing import Dict, Mapping
 
 import mido
+import numpy as np
 
 
 def _detect_tempo(mf: mido.MidiFile) -> int:
@@ -32,6 +33,11 @@ def shift_midi_bytes_per_track_index(
     播放器对前段 note 用默认 tempo,造成节奏错乱(实测 type 0 拖到最左的 bug)。
     """
     mf = mido.MidiFile(file=BytesIO(midi_bytes))
+    return _shift_tracks(mf, shifts)
+
+
+def _shift_tracks(mf: mido.MidiFile, shifts: Mapping[int, float]) -> bytes:
+    """shift_midi_bytes_per_track_index 的本体,直接吃已解析好的 MidiFile。"""
     spt = (_detect_tempo(mf) / 1_000_000.0) / mf.ticks_per_beat
     ticks_by_track: Dict[int, int] = {
         int(ti): int(round(float(s) / spt)) for ti, s in shifts.items()
@@ -39,24 +45,16 @@ def shift_midi_bytes_per_track_index(
 
     for ti, track in enumerate(mf.tracks):
         track_shift = ticks_by_track.get(ti, 0)
-        events = []
-        abs_tick = 0
-        for msg in track:
-            abs_tick += msg.time
-            shifted = max(0, abs_tick + track_shift) if track_shift else abs_tick
-            events.append((shifted, msg))
-        events.sort(key=lambda e: e[0])
-
-        new_track = mido.MidiTrack()
-        prev_abs = 0
-        for abs_t, msg in events:
-            if msg.type == "end_of_track":
-                continue  # mido 在 save 时自动追加
-            new_msg = msg.copy()
-            new_msg.time = abs_t - prev_abs
-            new_track.append(new_msg)
-            prev_abs = abs_t
-        mf.tracks[ti] = new_track
+        if not track_shift:
+            continue  # 不动的 track 原样保留,不逐条拷消息重建(save 时 mido 统一补 end_of_track)
+        # 绝对 tick = delta 的前缀和;平移后夹到 0 仍单调不减,原事件顺序不变、不用再排序
+        deltas = np.fromiter((m.time for m in track), dtype=np.int64, count=len(track))
+        shifted = np.maximum(np.cumsum(deltas) + track_shift, 0)
+        keep = [i for i, m in enumerate(track) if m.type != "end_of_track"]  # mido 在 save 时自动追加
+        new_deltas = np.diff(shifted[keep], prepend=0).tolist()
+        mf.tracks[ti] = mido.MidiTrack(
+            track[i].copy(time=d) for i, d in zip(keep, new_deltas)
+        )
 
     out = BytesIO()
     mf.save(file=out)
@@ -69,7 +67,10 @@ def magenta_instrument_to_track_index(midi_bytes: bytes) -> Dict[int, int]:
     magenta 1.x 在读取 type 1 midi 时,把每个**有 note 的** mido track 按出现顺序
     赋一个连续 0-based instrument id(跳过 conductor track 等无 note 的 track)。
     """
-    mf = mido.MidiFile(file=BytesIO(midi_bytes))
+    return _instrument_track_map(mido.MidiFile(file=BytesIO(midi_bytes)))
+
+
+def _instrument_track_map(mf: mido.MidiFile) -> Dict[int, int]:
     mapping: Dict[int, int] = {}
     next_id = 0
     for ti, tr in enumerate(mf.tracks):
@@ -79,17 +80,35 @@ def magenta_instrument_to_track_index(midi_bytes: bytes) -> Dict[int, int]:
     return mapping
 
 
+def _check_midi_header(midi_bytes: bytes) -> None:
+    """只看 14 字节文件头:MThd 标记 + 头长度 >= 6。轨道数据是否完好不在这里查。"""
+    if (
+        len(midi_bytes) < 14
+        or midi_bytes[:4] != b"MThd"
+        or int.from_bytes(midi_bytes[4:8], "big") < 6
+    ):
+        raise ValueError("not a MIDI file (missing MThd header)")
+
+
 def shift_midi_bytes_per_magenta_instrument(
     midi_bytes: bytes, shifts: Mapping[int, float]
 ) -> bytes:
     """按 magenta NoteSequence 的 instrument 编号平移。前端可以直接传 magenta instId。
 
-    内部把 magenta instId 映射到 mido track index 后,委托给 shift_midi_bytes_per_track_index。
+    内部把 magenta instId 映射到 mido track index 后按 track 平移。
+    mido 逐条消息解析是这里的大头,映射和平移共用同一次解析结果,不重复 parse;
+    所有偏移都是 0(只是原样保存)时结果与映射无关,只验文件头后直接返回原 bytes,不解析也不重写;
+    头正常但轨道数据损坏的文件这时不会报错(解析推迟到真有偏移时)。
     """
-    inst_to_track = magenta_instrument_to_track_index(midi_bytes)
+    if not any(float(sec) for sec in shifts.values()):
+        # 不解析也至少验一下 MThd 头,明显不是 MIDI 的内容照旧报错,不被当成"原样保存"放过
+        _check_midi_header(midi_bytes)
+        return midi_bytes
+    mf = mido.MidiFile(file=BytesIO(midi_bytes))
+    inst_to_track = _instrument_track_map(mf)
     track_shifts: Dict[int, float] = {}
     for inst, sec in shifts.items():
         i = int(inst)
         if i in inst_to_track:
             track_shifts[inst_to_track[i]] = float(sec)
-    return shift_midi_bytes_per_track_index(midi_bytes, track_shifts)
+    return _shift_tracks(mf, track_shifts)
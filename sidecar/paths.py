@@ -89,6 +89,10 @@ def sheet_cache_path() -> Path:
     return cache_dir() / "sheet_cache.json"
 
 
+def peaks_cache_dir() -> Path:
+    return cache_dir() / "peaks"
+
+
 def agent_upstream_log_path() -> Path:
     return log_dir(legacy_subdir="tmp") / "agent_upstream.jsonl"
 
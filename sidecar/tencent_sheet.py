@@ -38,6 +38,7 @@ import threading
 import time
 import urllib.error
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
@@ -52,6 +53,7 @@ _TOTAL_COLS = 37
 _LAST_COL_LETTER = "AK"   # 第 37 列,A1 notation 用
 _CHUNK_ROWS = 270         # 单次拉的最大行数(37 * 270 = 9990 cells, 留一点裕度)
 _MAX_ROWS_HARD_CAP = 5000  # 防御性兜底,防止表长意外炸成无限循环
+_FETCH_WORKERS = 4        # 分页并发数;按波次拉,遇到短块即停,最多多烧 workers-1 次配额
 
 _BASE_URL = "https://docs.qq.com/openapi/spreadsheet/v3/files"
 _HTTP_TIMEOUT_SEC = 30
@@ -188,21 +190,46 @@ class TencentSheetClient:
             # Tencent Docs can redact A1 when header + data rows are fetched together
             # (A1:AK1 returns "歌名", A1:AK2 returns "*******"). Fetch the header
             # separately, then page data rows from row 2.
-            collected: list[list[str]] = self._fetch_range_uncached(f"A1:{_LAST_COL_LETTER}1")
+            header_range = f"A1:{_LAST_COL_LETTER}1"
+            pages: list[tuple[int, int]] = []
             start = 2
             while start <= row_count:
                 end = min(start + _CHUNK_ROWS - 1, row_count)
-                a1 = f"A{start}:{_LAST_COL_LETTER}{end}"
-                chunk = self._fetch_range_uncached(a1)
-                collected.extend(chunk)
-                if not chunk or len(chunk) < (end - start + 1):
-                    break  # 提前到尾(空尾行)
+                pages.append((start, end))
                 start = end + 1
+            collected = self._fetch_pages(header_range, pages)
             self._cache = collected
             self._fetched_at = datetime.now()
             self._save_disk_cache()
             return collected
 
+    def _fetch_pages(
+        self, header_range: str, pages: list[tuple[int, int]]
+    ) -> list[list[str]]:
+        """并发拉表头 + 数据分页,按原顺序拼接。
+
+        单页是一次完整网络往返,串行时冷启动耗时 ≈ 页数 × RTT;这里每波并发
+        _FETCH_WORKERS 个 range。每波结果按顺序检查,出现短块(空尾行)就不再
+        发下一波 —— 和原先"边拉边判最后一块"的语义一致。
+        """
+        # (a1_range, 期望行数);表头不参与短块判定
+        ranges: list[tuple[str, int | None]] = [(header_range, None)]
+        ranges += [
+            (f"A{start}:{_LAST_COL_LETTER}{end}", end - start + 1)
+            for start, end in pages
+        ]
+        collected: list[list[str]] = []
+        with ThreadPoolExecutor(max_workers=_FETCH_WORKERS) as pool:
+            for i in range(0, len(ranges), _FETCH_WORKERS):
+                wave = ranges[i:i + _FETCH_WORKERS]
+                futs = [pool.submit(self._fetch_range_uncached, a1) for a1, _ in wave]
+                for (_, expected), fut in zip(wave, futs):
+                    chunk = fut.result()
+                    collected.extend(chunk)
+                    if expected is not None and (not chunk or len(chunk) < expected):
+                        return collected  # 提前到尾(空尾行)
+        return collected
+
     def _fetch_row_count(self) -> int:
         """从 spreadsheet metadata 拿当前 sheet 的真实行数。
 
@@ -280,9 +307,11 @@ class TencentSheetClient:
         if not path.is_file():
             return None
         try:
-            with path.open("r", encoding="utf-8") as f:
-                j = json.load(f)
-        except (OSError, json.JSONDecodeError):
+            # 整块读 bytes 交给 json.loads(自行识别 UTF-8),不走 TextIOWrapper 增量解码
+            j = json.loads(path.read_bytes())
+        except (OSError, ValueError):
+            return None
+        if not isinstance(j, dict):
             return None
         if j.get("spreadsheet_id") != self.spreadsheet_id:
             return None
@@ -307,22 +336,24 @@ class TencentSheetClient:
         if self._cache is None:
             return
         path = _disk_cache_path()
+        # 一次 dumps 成紧凑 bytes 再整块写:json.dump 写文件对象会按 token 碎写,
+        # 37 列 × 上千行时是上万次小 write;紧凑分隔符也让文件小一圈。
+        payload = json.dumps(
+            {
+                "spreadsheet_id": self.spreadsheet_id,
+                "sheet_id": self.sheet_id,
+                "fetched_at": (
+                    self._fetched_at.isoformat() if self._fetched_at else None
+                ),
+                "rows": self._cache,
+            },
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
         try:
             path.parent.mkdir(parents=True, exist_ok=True)
             tmp = path.with_suffix(path.suffix + ".tmp")
-            with tmp.open("w", encoding="utf-8") as f:
-                json.dump(
-                    {
-                        "spreadsheet_id": self.spreadsheet_id,
-                        "sheet_id": self.sheet_id,
-                        "fetched_at": (
-                            self._fetched_at.isoformat() if self._fetched_at else None
-                        ),
-                        "rows": self._cache,
-                    },
-                    f,
-                    ensure_ascii=False,
-                )
+            tmp.write_bytes(payload)
             tmp.replace(path)
         except OSError:
             pass  # cache 非关键,出错不打断主流程
@@ -23,6 +23,13 @@ def workspace():
     shutil.rmtree(d, ignore_errors=True)
 
 
+@pytest.fixture
+def peaks_cache(tmp_path, monkeypatch):
+    # get_audio_peaks 会落盘缓存,测试里指到临时目录,不往仓库 cache/ 写
+    monkeypatch.setenv("CHECKER_CACHE_DIR", str(tmp_path / "cache"))
+    return tmp_path / "cache" / "peaks"
+
+
 def _wav(path, frames, sr=96000, channels=2, subtype="PCM_24"):
     os.makedirs(os.path.dirname(path), exist_ok=True)
     data = np.zeros((frames, channels), dtype=np.int32)
@@ -96,6 +103,63 @@ def test_chat_proxies_openai_compat(monkeypatch):
     assert body["message"] == {"role": "assistant", "content": "pong"}
     assert body["model"] == "test-model"
 
+
+def test_shared_llm_client_closed_on_shutdown(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from sidecar import api
+
+    monkeypatch.setattr(api, "_llm_http", None)
+    with TestClient(api.app):
+        llm_client = api._llm_async_client()
+        assert not llm_client.is_closed
+    assert llm_client.is_closed
+    assert api._llm_http is None
+
+
+def test_agent_completion_retries_async_on_503(monkeypatch, tmp_path):
+    from sidecar import api, config
+
+    statuses = [503, 200]
+    sleeps = []
+
+    class DummyResponse:
+        def __init__(self, status_code):
+            self.status_code = status_code
+            self.headers = {}
+            self.text = "busy"
+
+        def json(self):
+            return {
+                "choices": [{"message": {"role": "assistant", "content": "ok"}, "finish_reason": "stop"}],
+                "usage": {},
+            }
+
+    class DummyAsyncClient:
+        async def post(self, url, json, headers):
+            return DummyResponse(statuses.pop(0))
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+
+    monkeypatch.setattr(
+        api,
+        "reload_config",
+        lambda: config.Config(
+            llm=config.LLMConfig(endpoint="http://llm.local", api_key="sk-test", model="m")
+        ),
+    )
+    monkeypatch.setattr(api, "_llm_async_client", lambda: DummyAsyncClient())
+    monkeypatch.setattr(api.asyncio, "sleep", fake_sleep)
+    monkeypatch.setattr(api.paths, "agent_upstream_log_path", lambda: tmp_path / "u.jsonl")
+
+    r = client.post("/agent/completion", json={"messages": [{"role": "user", "content": "hi"}]})
+    assert r.status_code == 200
+    assert r.json()["message"]["content"] == "ok"
+    assert len(sleeps) == 1
+    assert statuses == []
+
+
 def test_list_workspace_lists_songs(workspace):
     _song(workspace, "A_x_y")
     _song(workspace, "B_x_y")
@@ -206,6 +270,63 @@ def test_read_csv(workspace):
     assert body["rows"][0] == ["TIME", "LABEL"]
 
 
+def test_read_csv_window_counts_rows_outside_it(workspace):
+    p = os.path.join(workspace, "w.csv")
+    # 带引号内换行的字段算一行
+    Path(p).write_text('a,b\n1,"x\ny"\n2,z\n3,w\n4,v\n', encoding="utf-8")
+    r = client.get("/tools/read_csv", params={"path": p, "start": 1, "end": 3})
+    assert r.status_code == 200
+    body = r.json()
+    assert body["rows"] == [["1", "x\ny"], ["2", "z"]]
+    assert body["total_rows"] == 5
+    assert body["truncated"] is True
+    r = client.get("/tools/read_csv", params={"path": p, "start": 3, "end": 100})
+    body = r.json()
+    assert body["rows"] == [["3", "w"], ["4", "v"]]
+    assert body["truncated"] is False
+
+
+@pytest.mark.parametrize("text", [
+    "TIME,LABEL\n0.0,1.1\n\n0.5,\n",
+    "\ufeffa,b\nc,d",
+    "",
+    "only\n\n\n",
+    'a,"b,c"\n1,2\n',
+    "a,b\r\n1,2\r\n",
+    'a,"x\r\ny"\r\n1,2\r\n',
+    "a,b\rc,d\r",
+])
+def test_read_csv_simple_fast_path_matches_csv_reader(workspace, text):
+    import csv
+
+    p = os.path.join(workspace, "s.csv")
+    Path(p).write_bytes(text.encode("utf-8"))
+    with open(p, "r", encoding="utf-8-sig", newline="") as f:
+        expected = list(csv.reader(f))
+    body = client.get("/tools/read_csv", params={"path": p, "start": 0, "end": 1000}).json()
+    assert body["rows"] == expected
+    assert body["total_rows"] == len(expected)
+    body = client.get("/tools/read_csv", params={"path": p, "start": 1, "end": 2}).json()
+    assert body["rows"] == expected[1:2]
+    assert body["truncated"] is (len(expected) > 2)
+
+
+@pytest.mark.parametrize("text", ["", "a\n", "a,b\n\nc", "x\ny,z\n\n", "1\n2\n3\n4\n5"])
+def test_split_simple_csv_window_matches_full_split(text):
+    from sidecar import api
+
+    lines = text.split("\n")
+    if lines[-1] == "":
+        lines.pop()
+    full = [line.split(",") if line else [] for line in lines]
+    for start in range(len(full) + 2):
+        for size in (0, 1, 2, 100):
+            skipped, rows, rest = api._split_simple_csv_window(text, start, size)
+            s0 = min(start, len(full))
+            assert (skipped, rows) == (s0, full[s0:s0 + size])
+            assert skipped + len(rows) + rest == len(full)
+
+
 def test_read_text_truncation(workspace):
     p = os.path.join(workspace, "big.txt")
     Path(p).write_text("a" * 8192, encoding="utf-8")
@@ -303,12 +424,53 @@ def test_files_raw_serves_bytes(workspace):
     assert r.content == b"hello-bytes"
 
 
+def test_files_raw_etag_revalidates(workspace):
+    p = os.path.join(workspace, "note.txt")
+    Path(p).write_bytes(b"hello-bytes")
+    r = client.get("/files/raw", params={"path": p})
+    etag = r.headers["etag"]
+    assert r.headers["cache-control"] == "no-cache"
+
+    r2 = client.get("/files/raw", params={"path": p}, headers={"If-None-Match": etag})
+    assert r2.status_code == 304
+    assert r2.content == b""
+
+    # 内容变了 -> ETag 变,旧 ETag 拿到完整新字节
+    Path(p).write_bytes(b"changed-bytes!")
+    r3 = client.get("/files/raw", params={"path": p}, headers={"If-None-Match": etag})
+    assert r3.status_code == 200
+    assert r3.content == b"changed-bytes!"
+    assert r3.headers["etag"] != etag
+
+
+def test_files_raw_resumes_with_range_and_if_range(workspace):
+    p = os.path.join(workspace, "big.bin")
+    Path(p).write_bytes(bytes(range(256)) * 4)
+    etag = client.get("/files/raw", params={"path": p}).headers["etag"]
+
+    r = client.get(
+        "/files/raw", params={"path": p},
+        headers={"Range": "bytes=1000-", "If-Range": etag},
+    )
+    assert r.status_code == 206
+    assert r.content == (bytes(range(256)) * 4)[1000:]
+
+    # 文件变了 -> If-Range 不匹配 -> 回整份 200,续传方不会拼出混合内容
+    Path(p).write_bytes(b"x" * 1100)
+    r2 = client.get(
+        "/files/raw", params={"path": p},
+        headers={"Range": "bytes=1000-", "If-Range": etag},
+    )
+    assert r2.status_code == 200
+    assert r2.content == b"x" * 1100
+
+
 def test_files_raw_404_when_missing():
     r = client.get("/files/raw", params={"path": "/nope/missing.bin"})
     assert r.status_code == 404
 
 
-def test_get_audio_peaks(workspace):
+def test_get_audio_peaks(workspace, peaks_cache):
     p = os.path.join(workspace, "x.wav")
     sr = 48000
     # 写 1 秒正弦波，便于检查 min/max 大致接近 ±1
@@ -327,6 +489,92 @@ def test_get_audio_peaks(workspace):
     assert min(body["mins"]) < -0.7
 
 
+def test_get_audio_peaks_matches_blockwise_minmax_of_first_channel(workspace, peaks_cache):
+    p = os.path.join(workspace, "st.wav")
+    sr = 8000
+    rng = np.random.default_rng(0)
+    left = rng.uniform(-0.5, 0.5, sr).astype(np.float32)
+    right = rng.uniform(-1.0, 1.0, sr).astype(np.float32)
+    sf.write(p, np.stack([left, right], axis=1), sr, subtype="FLOAT")
+    r = client.get("/tools/get_audio_peaks", params={"path": p, "columns": 64})
+    assert r.status_code == 200
+    body = r.json()
+    spc = sr // 64
+    blocks = left[: spc * 64].reshape(64, spc)
+    # 只取第一声道,逐列 min/max 与参考实现一致(payload 量化到 1e-4)
+    assert np.allclose(body["mins"], blocks.min(axis=1), atol=1e-4)
+    assert np.allclose(body["maxs"], blocks.max(axis=1), atol=1e-4)
+    assert all(len(repr(v)) <= 8 for v in body["mins"] + body["maxs"])
+
+
+def test_get_audio_peaks_chunked_reduction_matches_whole_array(workspace, peaks_cache, monkeypatch):
+    from sidecar import api
+
+    p = os.path.join(workspace, "chunks.wav")
+    samples = np.random.default_rng(1).uniform(-1, 1, 10_000).astype(np.float32)
+    sf.write(p, samples, 8000, subtype="FLOAT")
+    # 块小到只放得下 3 列,强制走多块(含最后一块不满)
+    monkeypatch.setattr(api, "_PEAKS_CHUNK_SAMPLES", 300)
+    body = client.get("/tools/get_audio_peaks", params={"path": p, "columns": 100}).json()
+    blocks = samples.reshape(100, 100)
+    assert np.allclose(body["mins"], blocks.min(axis=1), atol=1e-4)
+    assert np.allclose(body["maxs"], blocks.max(axis=1), atol=1e-4)
+
+
+def test_get_audio_peaks_short_clip_one_sample_per_column(workspace, peaks_cache):
+    p = os.path.join(workspace, "short.wav")
+    samples = np.linspace(-0.5, 0.5, 150).astype(np.float32)
+    sf.write(p, samples, 8000, subtype="FLOAT")
+    r = client.get("/tools/get_audio_peaks", params={"path": p, "columns": 100})
+    assert r.status_code == 200
+    body = r.json()
+    # frames < 2*columns → 每列一个采样(多出的零头不画)
+    assert body["columns"] == 100
+    assert body["mins"] == body["maxs"]
+    assert np.allclose(body["mins"], samples[:100], atol=1e-4)
+
+
+def test_get_audio_peaks_served_from_disk_cache_until_file_changes(workspace, peaks_cache, monkeypatch):
+    p = os.path.join(workspace, "c.wav")
+    sf.write(p, np.linspace(-0.5, 0.5, 4000).astype(np.float32), 8000, subtype="FLOAT")
+    first = client.get("/tools/get_audio_peaks", params={"path": p, "columns": 50}).json()
+    assert len(list(peaks_cache.glob("*.npz"))) == 1
+
+    import soundfile
+
+    def boom(*_a, **_k):
+        raise AssertionError("should not decode")
+
+    monkeypatch.setattr(soundfile, "SoundFile", boom)
+    r = client.get("/tools/get_audio_peaks", params={"path": p, "columns": 50})
+    assert r.status_code == 200
+    assert r.json() == first
+    monkeypatch.undo()
+    monkeypatch.setenv("CHECKER_CACHE_DIR", str(peaks_cache.parent))
+
+    # 改写文件(size 变了)→ 缓存过期,重新解码,新结果覆盖同一个条目
+    sf.write(p, np.full(2000, 0.25, dtype=np.float32), 8000, subtype="FLOAT")
+    body = client.get("/tools/get_audio_peaks", params={"path": p, "columns": 50}).json()
+    assert body["frames"] == 2000
+    assert set(body["maxs"]) == {0.25}
+    assert len(list(peaks_cache.glob("*.npz"))) == 1
+
+
+def test_get_audio_peaks_disk_cache_is_bounded(workspace, peaks_cache, monkeypatch):
+    from sidecar import api
+
+    monkeypatch.setattr(api, "_PEAKS_CACHE_MAX_FILES", 2)
+    # 别的请求正在写的 tmp:裁剪不碰它
+    peaks_cache.mkdir(parents=True)
+    (peaks_cache / "inflight.tmp").write_bytes(b"")
+    for i in range(4):
+        p = os.path.join(workspace, f"b{i}.wav")
+        sf.write(p, np.zeros(800, dtype=np.float32), 8000, subtype="FLOAT")
+        client.get("/tools/get_audio_peaks", params={"path": p, "columns": 10})
+    assert len(list(peaks_cache.glob("*.npz"))) == 2
+    assert [t.name for t in peaks_cache.glob("*.tmp")] == ["inflight.tmp"]
+
+
 def test_get_audio_peaks_404():
     r = client.get("/tools/get_audio_peaks", params={"path": "/nope/x.wav"})
     assert r.status_code == 400
@@ -481,6 +481,21 @@ def test_execute_ops_text_edit_replace_all(tmp_workspace):
     assert result.executed[0]["replacements"] == 3
 
 
+def test_execute_ops_text_edit_identical_replacement_skips_write(tmp_workspace):
+    p = os.path.join(tmp_workspace, "a.txt")
+    Path(p).write_text("hello\r\nworld\n", encoding="utf-8", newline="")
+    os.utime(p, (1_000_000, 1_000_000))
+
+    result = fixers.execute_ops(
+        [{"type": "text_edit", "path": p, "old_string": "hello", "new_string": "hello"}],
+        workspace_root=tmp_workspace,
+    )
+    assert result.errors == []
+    assert result.executed[0]["replacements"] == 1
+    assert os.path.getmtime(p) == 1_000_000
+    assert Path(p).read_bytes() == b"hello\r\nworld\n"
+
+
 def test_execute_ops_text_edit_not_found_raises(tmp_workspace):
     p = os.path.join(tmp_workspace, "a.txt")
     Path(p).write_text("hello world\n", encoding="utf-8")
@@ -0,0 +1,28 @@
+"""logic_checker 对 Beat / Structure CSV 的逐行检查。"""
+
+import os
+
+from sidecar.logic_checker import LogicChecker
+
+
+def _csv_errors(song, name, content):
+    csv_dir = os.path.join(song, "csv")
+    os.makedirs(csv_dir, exist_ok=True)
+    path = os.path.join(csv_dir, name)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write(content)
+    return LogicChecker.check_song_folder(song).get(os.path.normpath(os.path.abspath(path)), [])
+
+
+def test_beat_csv_cell_with_form_feed_is_not_a_line_break(tmp_path):
+    # \x0c / \u2028 只是单元格里的字符,不是换行:行数、行号与文本模式 readlines() 一致
+    song = str(tmp_path / "A_Song_B")
+    assert _csv_errors(song, "Song_Beat.csv", "TIME,LABEL\n0.5,1\x0c.1\n1.0,1\u2028.2\n") == []
+
+
+def test_structure_csv_cell_with_line_separator_keeps_line_numbers(tmp_path):
+    song = str(tmp_path / "A_Song_B")
+    errors = _csv_errors(
+        song, "Song_Structure.csv", "Intro,Verse\r\n00:01,00:\u202830\r\n00:02\x0c,00:40\r\n",
+    )
+    assert errors == ["[时间格式错误] 第2行 00:\u202830 应为mm:ss格式"]
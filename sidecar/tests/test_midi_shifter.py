@@ -0,0 +1,154 @@
+"""midi_shifter tick-level shifting."""
+
+from io import BytesIO
+
+import mido
+import pytest
+
+from sidecar import midi_shifter
+
+
+def _two_track_midi() -> bytes:
+    # track 0 = conductor(只有 tempo),track 1 = 一个音符;120 BPM / 480 tpb → 1s = 960 tick
+    mf = mido.MidiFile(type=1, ticks_per_beat=480)
+    conductor = mido.MidiTrack()
+    conductor.append(mido.MetaMessage("set_tempo", tempo=500000, time=0))
+    notes = mido.MidiTrack()
+    notes.append(mido.Message("note_on", note=60, velocity=90, time=0))
+    notes.append(mido.Message("note_off", note=60, velocity=0, time=480))
+    mf.tracks.extend([conductor, notes])
+    out = BytesIO()
+    mf.save(file=out)
+    return out.getvalue()
+
+
+def test_shift_per_magenta_instrument_parses_once_and_shifts_note_track(monkeypatch):
+    src = _two_track_midi()
+    parses = []
+    real = mido.MidiFile
+
+    def counting(*args, **kwargs):
+        parses.append(1)
+        return real(*args, **kwargs)
+
+    monkeypatch.setattr(midi_shifter.mido, "MidiFile", counting)
+    out = midi_shifter.shift_midi_bytes_per_magenta_instrument(src, {0: 1.0})
+    assert len(parses) == 1
+
+    mf = real(file=BytesIO(out))
+    first_on = next(m for m in mf.tracks[1] if m.type == "note_on")
+    assert first_on.time == 960
+    # conductor track(无 note)不在 magenta instrument 里,不动
+    assert next(m for m in mf.tracks[0] if m.type == "set_tempo").time == 0
+
+
+def test_zero_shifts_return_original_bytes_without_parsing(monkeypatch):
+    src = _two_track_midi()
+
+    def boom(*_a, **_k):
+        raise AssertionError("should not parse")
+
+    monkeypatch.setattr(midi_shifter.mido, "MidiFile", boom)
+    assert midi_shifter.shift_midi_bytes_per_magenta_instrument(src, {0: 0.0, 1: 0}) is src
+    assert midi_shifter.shift_midi_bytes_per_magenta_instrument(src, {}) is src
+
+
+def test_zero_shifts_still_reject_non_midi_bytes():
+    with pytest.raises(ValueError):
+        midi_shifter.shift_midi_bytes_per_magenta_instrument(b"not a midi file", {0: 0.0})
+    with pytest.raises(ValueError):
+        midi_shifter.shift_midi_bytes_per_magenta_instrument(b"MThd\x00\x00\x00\x02" + b"\x00" * 8, {})
+
+
+def test_shift_tracks_leaves_unshifted_tracks_untouched():
+    mf = mido.MidiFile(file=BytesIO(_two_track_midi()))
+    conductor = mf.tracks[0]
+    out = midi_shifter._shift_tracks(mf, {0: 0.0, 1: 0.5})
+    assert mf.tracks[0] is conductor
+
+    shifted = mido.MidiFile(file=BytesIO(out))
+    assert [m.type for m in shifted.tracks[0]] == ["set_tempo", "end_of_track"]
+    assert next(m for m in shifted.tracks[1] if m.type == "note_on").time == 480
+
+
+def _abs_ticks(track):
+    t, out = 0, []
+    for m in track:
+        t += m.time
+        out.append((m.type, t))
+    return out
+
+
+def _three_track_midi() -> bytes:
+    # conductor + 两条音符轨;各轨 end_of_track 都带非零 delta(轨道尾部留白)
+    mf = mido.MidiFile(type=1, ticks_per_beat=480)
+    conductor = mido.MidiTrack([
+        mido.MetaMessage("set_tempo", tempo=500000, time=0),
+        mido.MetaMessage("end_of_track", time=1920),
+    ])
+    a = mido.MidiTrack([
+        mido.Message("note_on", note=60, velocity=90, time=0),
+        mido.Message("note_off", note=60, velocity=0, time=480),
+        mido.MetaMessage("end_of_track", time=240),
+    ])
+    b = mido.MidiTrack([
+        mido.Message("note_on", note=64, velocity=90, time=480),
+        mido.Message("note_off", note=64, velocity=0, time=480),
+        mido.MetaMessage("end_of_track", time=240),
+    ])
+    mf.tracks.extend([conductor, a, b])
+    out = BytesIO()
+    mf.save(file=out)
+    return out.getvalue()
+
+
+def test_shift_mixed_zero_and_nonzero_tracks_round_trip():
+    src = _three_track_midi()
+    # 120 BPM / 480 tpb:0.5s = 480 tick;track 1 后移 0.5s,track 0 / 2 偏移为 0
+    out = midi_shifter.shift_midi_bytes_per_track_index(src, {0: 0.0, 1: 0.5, 2: 0.0})
+    orig = mido.MidiFile(file=BytesIO(src))
+    shifted = mido.MidiFile(file=BytesIO(out))
+
+    # 不动的轨逐事件(含 end_of_track 的尾部 delta)与原文件一致
+    assert _abs_ticks(shifted.tracks[0]) == _abs_ticks(orig.tracks[0])
+    assert _abs_ticks(shifted.tracks[2]) == _abs_ticks(orig.tracks[2])
+    # 平移的轨:事件整体 +480,end_of_track 由 mido 重新补在最后一个事件处
+    assert _abs_ticks(shifted.tracks[1]) == [
+        ("note_on", 480), ("note_off", 960), ("end_of_track", 960),
+    ]
+
+
+def _reference_shift(midi_bytes: bytes, shifts) -> bytes:
+    # 改 numpy 之前的逐消息实现(绝对 tick 累加 → 夹 0 → 排序 → 重建 delta),
+    # 只作用于偏移非 0 的轨,与当前"零偏移轨原样保留"一致
+    mf = mido.MidiFile(file=BytesIO(midi_bytes))
+    spt = (midi_shifter._detect_tempo(mf) / 1_000_000.0) / mf.ticks_per_beat
+    for ti, track in enumerate(mf.tracks):
+        track_shift = int(round(float(shifts.get(ti, 0)) / spt))
+        if not track_shift:
+            continue
+        events, abs_tick = [], 0
+        for msg in track:
+            abs_tick += msg.time
+            events.append((max(0, abs_tick + track_shift), msg))
+        events.sort(key=lambda e: e[0])
+        new_track, prev_abs = mido.MidiTrack(), 0
+        for abs_t, msg in events:
+            if msg.type == "end_of_track":
+                continue
+            new_msg = msg.copy()
+            new_msg.time = abs_t - prev_abs
+            new_track.append(new_msg)
+            prev_abs = abs_t
+        mf.tracks[ti] = new_track
+    out = BytesIO()
+    mf.save(file=out)
+    return out.getvalue()
+
+
+def test_shift_tracks_bytes_match_reference_implementation():
+    src = _three_track_midi()
+    # 正向平移、带夹 0 的负向平移(前几个事件堆到 tick 0)、零偏移混在一起
+    for shifts in ({1: 0.25}, {2: -0.75}, {0: 0.1, 1: -2.0, 2: 0.6}, {1: 0.0, 2: 0.3}):
+        out = midi_shifter.shift_midi_bytes_per_track_index(src, shifts)
+        assert out == _reference_shift(src, shifts)
@@ -39,6 +39,7 @@ def test_electron_overrides_all_runtime_roots(tmp_path, monkeypatch):
 
     assert paths.state_tree_dir() == data / "state_tree"
     assert paths.sheet_cache_path() == cache / "sheet_cache.json"
+    assert paths.peaks_cache_dir() == cache / "peaks"
     assert paths.review_log_path() == logs / "review_log.jsonl"
     assert paths.agent_upstream_log_path() == logs / "agent_upstream.jsonl"
     assert paths.midi_debug_dir() == logs
@@ -69,6 +70,7 @@ def test_path_lookup_does_not_create_directories(tmp_path, monkeypatch):
 
     paths.state_tree_dir()
     paths.sheet_cache_path()
+    paths.peaks_cache_dir()
     paths.review_log_path()
     assert not data.exists()
     assert not cache.exists()
@@ -25,6 +25,32 @@ def test_wav_readers_fail_gracefully(tmp_path):
     assert LogicChecker.get_wav_duration_seconds(bad) is None
 
 
+def test_wav_info_cache_reuses_header_until_file_changes(tmp_path, monkeypatch):
+    from sidecar import logic_checker
+
+    p = str(tmp_path / "c.wav")
+    sf.write(p, np.zeros(8000, dtype="float32"), 8000)
+    calls = []
+    real_info = sf.info
+
+    def counting_info(path):
+        calls.append(path)
+        return real_info(path)
+
+    logic_checker._wav_info_cached.cache_clear()
+    monkeypatch.setattr(logic_checker.sf, "info", counting_info)
+
+    assert LogicChecker.get_wav_frames_and_rate(p) == (8000, 8000)
+    LogicChecker.check_wav_format(p)
+    assert len(calls) == 1
+
+    # 改写文件(帧数变了)-> mtime/size 变 -> 重新读头
+    sf.write(p, np.zeros(16000, dtype="float32"), 8000)
+    os.utime(p, ns=(1, 1))
+    assert LogicChecker.get_wav_frames_and_rate(p) == (16000, 8000)
+    assert len(calls) == 2
+
+
 def test_atomic_write_text_roundtrip(tmp_path):
     p = str(tmp_path / "x.txt")
     n = fixers._atomic_write_text(p, "héllo\nworld")
@@ -55,6 +55,52 @@ def test_fetch_all_fetches_header_separately(monkeypatch, tmp_path):
     ]
 
 
+def test_fetch_all_pages_concurrently_keeps_order_and_stops_on_short_chunk(monkeypatch, tmp_path):
+    from sidecar import tencent_sheet
+
+    client = _client()
+    monkeypatch.setattr(tencent_sheet, "_CHUNK_ROWS", 2)
+    monkeypatch.setattr(tencent_sheet, "_FETCH_WORKERS", 2)
+    monkeypatch.setattr(client, "_fetch_row_count", lambda: 9)
+    monkeypatch.setattr(tencent_sheet, "_disk_cache_path", lambda: tmp_path / "sheet_cache.json")
+    calls = []
+    pages = {
+        "A1:AK1": [["歌名"]],
+        "A2:AK3": [["a"], ["b"]],
+        "A4:AK5": [["c"], ["d"]],
+        "A6:AK7": [["e"]],  # 短块:表尾
+        "A8:AK9": [],
+    }
+
+    def fake_fetch_range(a1_range):
+        calls.append(a1_range)
+        return pages[a1_range]
+
+    monkeypatch.setattr(client, "_fetch_range_uncached", fake_fetch_range)
+
+    rows = client.fetch_all(force=True)
+
+    assert rows == [["歌名"], ["a"], ["b"], ["c"], ["d"], ["e"]]
+    assert "A8:AK9" not in calls
+
+
+def test_disk_cache_roundtrip(monkeypatch, tmp_path):
+    from datetime import datetime
+
+    from sidecar import tencent_sheet
+
+    cache_file = tmp_path / "sheet_cache.json"
+    monkeypatch.setattr(tencent_sheet, "_disk_cache_path", lambda: cache_file)
+    client = _client()
+    client._cache = [["歌名"], ["望春风"]]
+    client._fetched_at = datetime(2024, 1, 2, 3, 4, 5)
+    client._save_disk_cache()
+
+    loaded = _client()._load_disk_cache()
+    assert loaded == {"rows": [["歌名"], ["望春风"]], "fetched_at": datetime(2024, 1, 2, 3, 4, 5)}
+    assert "望春风" in cache_file.read_text(encoding="utf-8")
+
+
 def test_disk_cache_path_uses_cache_override(tmp_path, monkeypatch):
     from sidecar import tencent_sheet
 